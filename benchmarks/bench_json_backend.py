@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+
+"""
+Compare the JSON backends available to param_to_json on parameter files
+
+usage:
+    | $> python benchmarks/bench_json_backend.py [<json file>] [-n <repeat>]
+example:
+    | $> python benchmarks/bench_json_backend.py test/input/prot-prot-em.json
+    | file: test/input/prot-prot-em.json (119281 bytes, 2 partners)
+    | backend   load (ms)   dumps (ms)
+    | orjson        0.071        0.125
+    | json          0.168        0.631
+
+Without file argument, the test parameter file is used as well as a
+20 partners version of it to mimic large complexes.
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from param_to_json import json_backend
+
+DEFAULT_FILE = os.path.join(os.path.dirname(__file__), '..', 'test', 'input', 'prot-prot-em.json')
+
+
+def make_large(text, nb_partners=20):
+    """Build a parameter file with nb_partners partners from an existing one"""
+    params = json_backend.loads(text)
+    partners = list(params['partners'].values())
+    params['partners'] = {str(i + 1): dict(partners[i % len(partners)], segid=chr(65 + i))
+                          for i in range(nb_partners)}
+    return json_backend.dumps(params, indent=2, sort_keys=True)
+
+
+def bench(label, text, repeat):
+    params = json_backend.loads(text)
+    sys.stdout.write(f"file: {label} ({len(text)} bytes, {len(params['partners'])} partners)\n")
+    sys.stdout.write(f"{'backend':<8}{'load (ms)':>12}{'dumps (ms)':>13}\n")
+    reference = None
+    for name in json_backend.available_backends():
+        json_backend.select_backend(name)
+        t_load = min(timeit.repeat(lambda: json_backend.loads(text), number=repeat, repeat=5)) / repeat
+        t_dump = min(timeit.repeat(lambda: json_backend.dumps(params, indent=2, sort_keys=True),
+                                   number=repeat, repeat=5)) / repeat
+        out = json_backend.dumps(params, indent=2, sort_keys=True)
+        if reference is None:
+            reference = out
+        identical = '' if out == reference else '  (output differs!)'
+        sys.stdout.write(f"{name:<8}{t_load * 1000:>12.3f}{t_dump * 1000:>13.3f}{identical}\n")
+    sys.stdout.write("\n")
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    repeat = 50
+    if '-n' in args:
+        i = args.index('-n')
+        repeat = int(args[i + 1])
+        del args[i:i + 2]
+
+    if args:
+        for path in args:
+            with open(path) as fh:
+                bench(path, fh.read(), repeat)
+    else:
+        with open(DEFAULT_FILE) as fh:
+            text = fh.read()
+        bench('prot-prot-em.json', text, repeat)
+        bench('prot-prot-em.json x 20 partners', make_large(text), repeat)
+    json_backend.select_backend()
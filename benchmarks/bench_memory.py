@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+
+"""
+Report the peak and retained memory of the main operations on parameter files
+
+usage:
+    | $> python benchmarks/bench_memory.py [<json file> ...]
+example:
+    | $> python benchmarks/bench_memory.py test/input/prot-prot-em.json
+    | file: test/input/prot-prot-em.json (119281 bytes)
+    | operation                  peak (B)  retained (B)   peak/size
+    | HADDOCKParam.load            267698        141376        2.24
+    | ...
+"""
+
+import os
+import io
+import sys
+import contextlib
+import importlib.util
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from param_to_json import HADDOCKParam, compile_path
+from param_to_json.profiling import MemoryUsage, measure
+
+SCRIPTS = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+DEFAULT_FILE = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'test', 'input', 'prot-prot-em.json'))
+
+
+def load_script(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPTS, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def report(path):
+    size = os.path.getsize(path)
+    usages = []
+
+    params = HADDOCKParam()
+    with MemoryUsage('HADDOCKParam.load') as usage:
+        params.load(path)
+    usages.append(usage)
+    usages.append(measure(params.validate)[1])
+    usages.append(measure(params.dumps)[1])
+    usages.append(measure(params.derive, amb_cool1=20.0)[1])
+
+    summary = load_script('haddock_param_summary')
+    validate = load_script('haddock_param_validate')
+    replace = load_script('haddock_param_replace')
+    with open(path) as fh, contextlib.redirect_stdout(io.StringIO()):
+        usages.append(measure(summary.print_summary, fh)[1])
+    with open(path) as fh:
+        usages.append(measure(validate.validate, fh, False)[1])
+    with open(path) as fh:
+        usages.append(measure(replace.replace, fh, compile_path('amb_cool1'), '20.0')[1])
+    usages[-3].label, usages[-2].label, usages[-1].label = 'hp_summary', 'hp_validate', 'hp_replace'
+
+    sys.stdout.write(f"file: {path} ({size} bytes)\n")
+    sys.stdout.write(f"{'operation':<24}{'peak (B)':>12}{'retained (B)':>14}{'peak/size':>12}\n")
+    for usage in usages:
+        sys.stdout.write(f"{usage.label:<24}{usage.peak:>12}{usage.retained:>14}{usage.peak / size:>12.2f}\n")
+    sys.stdout.write("\n")
+
+
+if __name__ == '__main__':
+    for path in sys.argv[1:] or [DEFAULT_FILE]:
+        report(path)
@@ -9,10 +9,20 @@ structure HADDOCKParam that needs to be initialized prior to
 doing anything.
 """
 
-import json
+import copy
 import logging
+import re
+import sys
+import threading
+from array import array
+from collections import ChainMap
+from collections.abc import Mapping, MutableMapping
+from functools import lru_cache
+from types import MappingProxyType
 from json import JSONDecodeError
 
+from . import archive, json_backend, wire
+
 __author__ = 'Mikael Trellet'
 __email__ = "mikael.trellet@gmail.com"
 __version__ = '0.1'
@@ -41,11 +51,430 @@ class HADDOCKParamFormatError(Exception):
         Exception.__init__(self, full_message)
 
 
+def _json_default(obj):
+    """Serialize objects that the json module does not know about"""
+    if isinstance(obj, Partner):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class Partner(MutableMapping):
+    """
+    Compact representation of a partner (molecule) of a HADDOCK parameter file.
+
+    Fields are stored in slots rather than in a per-partner dictionary, residue
+    lists are held in ``array('i')`` and short strings are interned so that they
+    are shared between loaded files. ``raw_pdb`` can be given as a callable
+    returning the PDB content, it is then only called on first access (on every
+    access if the callable has a true ``persistent`` attribute, its ``release``
+    method being then called when it is replaced or deleted, and its ``share``
+    method when the partner is copied).
+
+    Attributes give access to the compact form of the fields, while the mapping
+    interface (``partner['activereslist']``) returns their JSON form.
+    """
+
+    key_types = {'activereslist': 'list', 'auto_his': 'bool', 'auto_passive': 'bool', 'cg': 'bool',
+                 'chain': 'str', 'charged_cter': 'bool', 'charged_nter': 'bool', 'dna': 'bool',
+                 'fix_origin': 'bool', 'fully_flex': 'list', 'his_patch': 'dict', 'link_file': 'str',
+                 'mode': 'str', 'moleculetype': 'str', 'par_file': 'str', 'passivereslist': 'list',
+                 'pdb_file': 'str', 'psf_file': 'str', 'raw_pdb': 'str', 'root': 'str', 'segid': 'str',
+                 'semi_flex': 'list', 'top_file': 'str'}
+    residue_keys = ('activereslist', 'passivereslist')
+
+    __slots__ = tuple(k for k in key_types if k != 'raw_pdb') + ('_raw_pdb', '_extra')
+
+    def __init__(self, **fields):
+        self._extra = None
+        for k, v in fields.items():
+            self[k] = v
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create a Partner from its JSON form
+
+        :param dict data: Partner entry as found in ``params['partners']``
+        :rtype: Partner
+        """
+        return cls(**data)
+
+    def to_dict(self):
+        """Return the JSON form of the partner
+
+        :rtype: dict
+        """
+        return {k: self[k] for k in self}
+
+    @property
+    def raw_pdb(self):
+        value = self._raw_pdb
+        if callable(value):
+            if getattr(value, 'persistent', False):
+                # Managed elsewhere, e.g. by a spill store
+                return value()
+            value = self._raw_pdb = value()
+        return value
+
+    @raw_pdb.setter
+    def raw_pdb(self, value):
+        old = getattr(self, '_raw_pdb', None)
+        self._raw_pdb = value
+        if old is not value and getattr(old, 'persistent', False):
+            old.release()
+
+    @raw_pdb.deleter
+    def raw_pdb(self):
+        old = self._raw_pdb
+        del self._raw_pdb
+        if getattr(old, 'persistent', False):
+            old.release()
+
+    def __getitem__(self, key):
+        if key not in self.key_types:
+            if self._extra and key in self._extra:
+                return self._extra[key]
+            raise KeyError(key)
+        try:
+            value = getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+        if isinstance(value, array):
+            return value.tolist()
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in self.key_types:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+            return
+        if key in self.residue_keys and isinstance(value, list) and all(type(v) is int for v in value):
+            try:
+                value = array('i', value)
+            except OverflowError:
+                # Not a plain list of residue numbers, keep it as is
+                pass
+        elif key != 'raw_pdb' and isinstance(value, str):
+            value = sys.intern(value)
+        setattr(self, key, value)
+
+    def __delitem__(self, key):
+        if key not in self.key_types:
+            if self._extra and key in self._extra:
+                del self._extra[key]
+                return
+            raise KeyError(key)
+        try:
+            delattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        for k in self.key_types:
+            if hasattr(self, '_raw_pdb' if k == 'raw_pdb' else k):
+                yield k
+        if self._extra:
+            yield from self._extra
+
+    def __contains__(self, key):
+        if key in self.key_types:
+            return hasattr(self, '_raw_pdb' if key == 'raw_pdb' else key)
+        return bool(self._extra) and key in self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __copy__(self):
+        new = self.__class__.__new__(self.__class__)
+        for k in self.__slots__:
+            if hasattr(self, k):
+                setattr(new, k, getattr(self, k))
+        if self._extra:
+            new._extra = dict(self._extra)
+        if getattr(getattr(self, '_raw_pdb', None), 'persistent', False):
+            self._raw_pdb.share()
+        return new
+
+    def __repr__(self):
+        return f"Partner(moleculetype={getattr(self, 'moleculetype', None)!r}, " \
+               f"segid={getattr(self, 'segid', None)!r})"
+
+
+class ParamPath(object):
+    """
+    Compiled accessor for a (possibly nested) parameter of a parameter file.
+
+    Paths are made of keys separated by dots, list items being addressed
+    either with a dotted number or between brackets, e.g. ``amb_cool1``,
+    ``partners.2.activereslist``, ``weights.vdw[2]`` or ``queues.0.cpunumber``.
+    Use :func:`compile_path` to get cached instances.
+
+    :param str path: Path of the parameter
+    :raise: HADDOCKParamError
+    """
+
+    path_re = re.compile(r'[^.\[\]]+(\[-?\d+\])*(\.[^.\[\]]+(\[-?\d+\])*)*$')
+    step_re = re.compile(r'([^.\[\]]+)|\[(-?\d+)\]')
+
+    __slots__ = ('path', 'steps', 'leaf_type', 'item_type')
+
+    def __init__(self, path):
+        if not self.path_re.match(path):
+            raise HADDOCKParamError(f'Invalid parameter path "{path}"')
+        self.path = path
+        self.steps = tuple(key if key else int(index) for key, index in self.step_re.findall(path))
+        self.leaf_type, self.item_type = self._schema_types(self.steps)
+
+    @staticmethod
+    def _schema_types(steps):
+        """Expected type of the leaf value and of its items (for lists) when known from the schema"""
+        top = steps[0]
+        if len(steps) == 1:
+            return HADDOCKParam.key_types.get(top), None
+        elif top == 'partners' and len(steps) == 3:
+            field = steps[2]
+            return Partner.key_types.get(field), 'int' if field in Partner.residue_keys else None
+        elif top == 'partners' and len(steps) == 4 and steps[2] in Partner.residue_keys:
+            return 'int', None
+        elif top == 'weights' and len(steps) == 2:
+            return 'list', 'float'
+        elif top == 'weights' and len(steps) == 3:
+            return 'float', None
+        return None, None
+
+    def __repr__(self):
+        return f"ParamPath({self.path!r})"
+
+    @staticmethod
+    def _index(node, step):
+        if isinstance(step, str) and isinstance(node, (list, array)):
+            return int(step)
+        return step
+
+    @classmethod
+    def _child(cls, node, step):
+        if isinstance(node, Partner) and step in Partner.key_types:
+            # Go through attributes to reach the compact values (e.g. residue arrays)
+            return getattr(node, step)
+        return node[cls._index(node, step)]
+
+    @classmethod
+    def _replace_child(cls, node, step, child):
+        if isinstance(node, Partner) and step in Partner.key_types:
+            setattr(node, step, child)
+        else:
+            node[cls._index(node, step)] = child
+
+    def _parent(self, params, cow=False):
+        node = params
+        for step in self.steps[:-1]:
+            child = self._child(node, step)
+            if cow:
+                # Copy-on-write: never modify containers that may be shared with other parameter sets
+                child = array(child.typecode, child) if isinstance(child, array) else copy.copy(child)
+                self._replace_child(node, step, child)
+            node = child
+        return node
+
+    def get(self, params):
+        """Get the value addressed by the path in params
+
+        :param params: Parameters, as found in :attr:`HADDOCKParam.params`
+        :raise: HADDOCKParamError
+        """
+        try:
+            node = self._parent(params)
+            return node[self._index(node, self.steps[-1])]
+        except (KeyError, IndexError, TypeError, ValueError, AttributeError):
+            raise HADDOCKParamError(f'Parameter "{self.path}" not found') from None
+
+    def check(self, value, current):
+        """Check that value has the expected type for the path
+
+        :param value: New value
+        :param current: Current value at this path, used when the schema does not define the type
+        :raise: HADDOCKParamFormatError
+        """
+        expected = self.leaf_type or type(current).__name__
+        if type(value).__name__ != expected:
+            raise HADDOCKParamFormatError(f"Wrong format: {type(value).__name__} instead of {expected}",
+                                          param=self.path)
+        if self.item_type:
+            for item in value:
+                if type(item).__name__ != self.item_type:
+                    raise HADDOCKParamFormatError(f"Wrong format: list of {type(item).__name__} instead of "
+                                                  f"list of {self.item_type}", param=self.path)
+
+    def set(self, params, value, cow=False, check=True):
+        """Set the value addressed by the path in params after checking its type
+
+        :param params: Parameters, as found in :attr:`HADDOCKParam.params`
+        :param value: New value
+        :param bool cow: Copy the containers along the path instead of modifying them
+        :param bool check: Check the type of value, skipped when already done by the caller
+        :raise: HADDOCKParamError, HADDOCKParamFormatError
+        """
+        if check:
+            self.check(value, self.get(params))
+        try:
+            node = self._parent(params, cow=cow)
+            node[self._index(node, self.steps[-1])] = value
+        except (TypeError, OverflowError) as e:
+            raise HADDOCKParamFormatError(f"Wrong format: {e}", param=self.path) from None
+
+
+@lru_cache(maxsize=1024)
+def compile_path(path):
+    """Parse a parameter path once and return its cached :class:`ParamPath`
+
+    :param str path: Path of the parameter, e.g. ``partners.2.activereslist`` or ``weights.vdw[2]``
+    :rtype: ParamPath
+    :raise: HADDOCKParamError
+    """
+    return ParamPath(path)
+
+
+_TYPES = {'int': (int,), 'float': (float,), 'str': (str,), 'bool': (bool,), 'list': (list,), 'dict': (dict,)}
+# Missing values of the parameters, distinct from None
+_MISSING = object()
+
+
+def _compile_items(spec):
+    """Compile the schema of the items of a list or dict into a function checking them
+
+    :param spec: Type name of the items, :class:`SchemaLevel` validating them, or pair of the type name of
+        the items and the schema of their own items
+    :return: Function called with the container and its path
+    """
+    if isinstance(spec, SchemaLevel):
+        def check(container, path):
+            for k, item in (container.items() if type(container) is dict else enumerate(container)):
+                if type(item) is not dict:
+                    raise HADDOCKParamFormatError(f"Wrong format: {type(item).__name__} instead of dict",
+                                                  param=f'{path}.{k}')
+                spec.check(item, f'{path}.{k}')
+        return check
+
+    type_name, items = spec if isinstance(spec, tuple) else (spec, None)
+    types = frozenset(_TYPES[type_name])
+    check_items = _compile_items(items) if items else None
+
+    def check(container, path):
+        values = container.values() if type(container) is dict else container
+        # Check the types of all the items at once, then look for the culprit
+        if not types.issuperset(map(type, values)):
+            for k, item in (container.items() if type(container) is dict else enumerate(container)):
+                if type(item) not in types:
+                    raise HADDOCKParamFormatError(f"Wrong format: {type(item).__name__} instead of {type_name}",
+                                                  param=f'{path}.{k}')
+        if check_items:
+            for k, item in (container.items() if type(container) is dict else enumerate(container)):
+                check_items(item, f'{path}.{k}')
+    return check
+
+
+class SchemaLevel(object):
+    """
+    Validator of one level of the parameters (e.g. a partner), compiled once from its schema.
+
+    All the keys of the schema are required, other keys are allowed.
+
+    :param dict key_types: Type name of the value of each key
+    :param dict items: Schema of the items of list or dict values by key, see :func:`_compile_items`
+    :param dict accept: Other types accepted by key, e.g. arrays for residue lists
+    """
+
+    __slots__ = ('checks',)
+
+    def __init__(self, key_types, items=None, accept=None):
+        items, accept = items or {}, accept or {}
+        self.checks = tuple((key, _TYPES[type_name] + accept.get(key, ()), type_name,
+                             _compile_items(items[key]) if key in items else None)
+                            for key, type_name in key_types.items())
+
+    def check(self, node, path=None, errors=None):
+        """Check the keys and value types of a level of the parameters
+
+        :param node: Level of the parameters, dict or :class:`Partner`
+        :param str path: Path of the level, used in error messages
+        :param list errors: If given, errors are appended to it instead of being raised
+        :raise: HADDOCKParamFormatError
+        """
+        partner = type(node) is Partner
+        for key, types, type_name, check_items in self.checks:
+            if partner:
+                # Do not load a lazy raw_pdb, nor convert compact values to their JSON form
+                value = getattr(node, '_raw_pdb' if key == 'raw_pdb' else key, _MISSING)
+                if callable(value) and key == 'raw_pdb':
+                    continue
+            else:
+                value = node.get(key, _MISSING)
+            param = f'{path}.{key}' if path else key
+            try:
+                if value is _MISSING:
+                    raise HADDOCKParamFormatError("Key missing.", param=param)
+                elif type(value) not in types:
+                    raise HADDOCKParamFormatError(f"Wrong format: {type(value).__name__} instead of {type_name}",
+                                                  param=param)
+                elif check_items and type(value) in _TYPES[type_name]:
+                    check_items(value, param)
+            except HADDOCKParamFormatError as e:
+                if errors is None:
+                    raise
+                errors.append(e)
+
+
+_PARTNER_NUMBER = re.compile(r'[1-9][0-9]*')
+_PARTNER_SCHEMA = SchemaLevel(Partner.key_types, items={'activereslist': 'int', 'passivereslist': 'int',
+                                                        'his_patch': 'str'},
+                              accept={'activereslist': (array,), 'passivereslist': (array,)})
+
+
+def check_partners(partners, errors=None):
+    """Check all the partners in a single pass, and their numbering
+
+    Partners must be numbered "1" to "N" and have different segids.
+
+    :param dict partners: Partners, as found in ``params['partners']``
+    :param list errors: If given, errors are appended to it instead of being raised
+    :raise: HADDOCKParamFormatError
+    """
+    nb_partners = len(partners)
+    segids = set()
+    for i, partner in partners.items():
+        path = f'partners.{i}'
+        try:
+            if not (type(i) is str and _PARTNER_NUMBER.fullmatch(i) and int(i) <= nb_partners):
+                raise HADDOCKParamFormatError(f'Wrong partner number "{i}", partners must be numbered from 1 to '
+                                              f'{nb_partners}', param='partners')
+            if type(partner) is not Partner and type(partner) is not dict:
+                raise HADDOCKParamFormatError(f"Wrong format: {type(partner).__name__} instead of dict", param=path)
+            _PARTNER_SCHEMA.check(partner, path, errors)
+            # Missing or wrong segids have been reported by the schema
+            segid = partner.get('segid')
+            if type(segid) is str and segid in segids:
+                raise HADDOCKParamFormatError(f'Segid "{segid}" used by several partners', param=f'{path}.segid')
+        except HADDOCKParamFormatError as e:
+            if errors is None:
+                raise
+            errors.append(e)
+            continue
+        segids.add(segid)
+
+
 class HADDOCKParam(object):
     """
     Top-level class representing a complete HADDOCK parameter file.
 
+    In thread-safe mode, :meth:`set` never modifies the parameters in place: it
+    builds a new version of them (sharing all unchanged values) and swaps it
+    atomically, writers being serialized by a lock. Readers are never blocked and
+    always see a consistent version of the parameters, :meth:`snapshot` giving
+    access to one version for several reads. Parameters should be loaded before
+    the object is shared between threads.
+
     :param bool verbose: Get validation details and warnings
+    :param bool thread_safe: Allow concurrent use from several threads
     """
 
     key_types = {'amb_cool1': 'float', 'amb_cool2': 'float', 'amb_cool3': 'float', 'amb_firstit': 'int',
@@ -86,7 +515,7 @@ class HADDOCKParam(object):
                  'waterheatsteps': 'int', 'waterrefine': 'int', 'watersteps': 'int', 'weights': 'dict', 'zres': 'dict',
                  'zres_on': 'bool', 'zresmax': 'float', 'zresmin': 'float'}
 
-    def __init__(self, verbose=True):
+    def __init__(self, verbose=True, thread_safe=False):
         self.verbose = verbose
         self.path = ""
         self.params = {}
@@ -94,6 +523,20 @@ class HADDOCKParam(object):
         self.valid = False
         self.loaded = False
         self.nb_partners = 0
+        self._lock = threading.Lock() if thread_safe else None
+
+    @property
+    def thread_safe(self):
+        return self._lock is not None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_lock'] = self.thread_safe
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock() if state['_lock'] else None
 
     @property
     def nb_partners(self):
@@ -115,15 +558,35 @@ class HADDOCKParam(object):
         self.check_status()
         return len(self.params["partners"])
 
+    @property
+    def partners(self):
+        """Partners of the parameter set as :class:`Partner` objects, indexed by partner number"""
+        self.check_status()
+        return self.params["partners"]
+
     def _load(self, jsonfh, skip_validation):
         try:
-            self.params = json.load(jsonfh)
+            # JSON, or binary parameters written by a script through a pipe
+            params = wire.load(jsonfh)
+            if not isinstance(params, dict):
+                raise HADDOCKParamFormatError(f"Wrong format: {type(params).__name__} instead of dict, "
+                                              f"not a parameter file")
+            partners = params.get('partners')
+            if isinstance(partners, dict):
+                params['partners'] = {k: Partner.from_dict(v) if isinstance(v, dict) else v
+                                      for k, v in partners.items()}
+            self.params = params
             self.skip_validation = skip_validation
             if not skip_validation:
                 self.valid = self.validate(init=True)
             self.loaded = True
         except JSONDecodeError as e:
             raise HADDOCKParamFormatError(f"Error while loading JSON file: {e}")
+        except wire.WireFormatError as e:
+            raise HADDOCKParamFormatError(f"Error while loading parameters: {e}")
+        except ValueError as e:
+            # e.g. UnicodeDecodeError, content that is not UTF-8
+            raise HADDOCKParamFormatError(f"Error while loading parameters: {e}")
         except HADDOCKParamFormatError:
             raise
 
@@ -148,25 +611,29 @@ class HADDOCKParam(object):
         :rtype: bool
         :raise: HADDOCKParamFormatError
         """
-        if self.skip_validation:
-            self.skip_validation = False
+        # Work on one version of the parameters, they may be swapped by another thread
+        params = self.params
+        if not isinstance(params, Mapping):
+            raise HADDOCKParamFormatError(f"Wrong format: {type(params).__name__} instead of dict")
         # Check that all required keys are present and have proper value type
         # TODO Clean non required keys, by default all are required
-        for k, v in self.key_types.items():
-            if k not in self.params:
-                raise HADDOCKParamFormatError("Key missing.", param=k)
-            elif type(self.params[k]).__name__ != v:
-                raise HADDOCKParamFormatError(f"Wrong format: {type(self.params[k]).__name__} instead of {v}", param=k)
+        self.schema.check(params)
+        check_partners(params['partners'])
 
-        self.nb_partners = len(self.params['partners'])
+        if self.skip_validation and not init:
+            # The parameters have now been validated
+            self.valid, self.skip_validation = True, False
+
+        nb_partners = len(params['partners'])
+        self.nb_partners = nb_partners
         if self.verbose and not init:
-            if not self.nb_partners:
+            if not nb_partners:
                 logging.warning("No partner defined")
                 return False
-            elif self.nb_partners < 2:
+            elif nb_partners < 2:
                 logging.warning("Only one partner defined")
                 return False
-            elif self.nb_partners > 20:
+            elif nb_partners > 20:
                 logging.warning("More than 20 partners defined, HADDOCK currently supports up to 20 partners")
                 return False
         return True
@@ -174,40 +641,156 @@ class HADDOCKParam(object):
     def load(self, input, skip_validation=False):
         """Load the parameter file in a HADDOCKParam object
 
-        :param input: JSON file path or file-object
+        :param input: JSON file path, archive member (``archive.tar.gz::path/in/archive.json``),
+            archive containing a single JSON file, or file-object
         :param skip_validation: Flag to skip or not the validation step
         :type input: str, file
         :type skip_validation: bool
         """
-        if isinstance(input, str):
+        if isinstance(input, str) and (archive.SEP in input or archive.is_archive(input)):
+            try:
+                jsonfh = archive.open_file(input)
+            except archive.ArchiveError as e:
+                raise HADDOCKParamError(str(e))
+            with jsonfh:
+                self._load(jsonfh, skip_validation)
+        elif isinstance(input, str):
             with open(input, 'r') as jsonfh:
                 self._load(jsonfh, skip_validation)
         else:
             self._load(input, skip_validation)
 
     def get(self, param):
-        """Get value of a parameter using its name
+        """Get value of a parameter using its name or path
 
-        :param param: Name of the parameter
+        :param param: Name of the parameter, or path to a nested parameter
+            (e.g. ``partners.2.activereslist`` or ``weights.vdw[2]``), see :class:`ParamPath`
+        :type param: str, ParamPath
         """
         if not self.skip_validation:
             self.check_status()
-        if param not in self.params:
+        params = self.params
+        if isinstance(param, ParamPath):
+            return param.get(params)
+        elif param not in params:
+            if '.' in param or '[' in param:
+                return compile_path(param).get(params)
             raise HADDOCKParamError(f'Parameter "{param}" not found')
         else:
-            return self.params.get(param)
+            return params[param]
 
-    def set(self, param, value):
-        """Get value of a parameter using its name
+    def snapshot(self):
+        """Get a read-only view of the current version of the parameters
+
+        In thread-safe mode, the view is not affected by later calls to :meth:`set`.
 
-        :param param: Name of the parameter
+        :rtype: mappingproxy
         """
         if not self.skip_validation:
             self.check_status()
-        if param not in self.params:
+        return MappingProxyType(self.params)
+
+    def _set(self, params, param, value, cow):
+        if isinstance(param, ParamPath) or (param not in params and ('.' in param or '[' in param)):
+            path = param if isinstance(param, ParamPath) else compile_path(param)
+            path.set(params, value, cow=cow)
+        elif param not in params:
             raise HADDOCKParamError(f'Parameter "{param}" not found')
         elif type(value).__name__ != self.key_types[param]:
             raise HADDOCKParamFormatError(f"Wrong format: {type(value).__name__} instead of {self.key_types[param]}",
                                           param=param)
         else:
-            self.params[param] = value
+            params[param] = value
+
+    def set(self, param, value):
+        """Set value of a parameter using its name or path
+
+        :param param: Name of the parameter, or path to a nested parameter
+            (e.g. ``partners.2.activereslist`` or ``weights.vdw[2]``), see :class:`ParamPath`
+        :type param: str, ParamPath
+        :param value: New value, its type must match the current one
+        """
+        if not self.skip_validation:
+            self.check_status()
+        if self._lock is None:
+            # Derived parameter sets share their nested values with their parent
+            self._set(self.params, param, value, cow=isinstance(self.params, ChainMap))
+            return
+        with self._lock:
+            params = self.params
+            if isinstance(params, ChainMap):
+                params = ChainMap(dict(params.maps[0]), *params.maps[1:])
+            else:
+                params = dict(params)
+            self._set(params, param, value, cow=True)
+            # Atomic swap, readers keep the version they already hold
+            self.params = params
+
+    def derive(self, **overrides):
+        """Create a lightweight variant of the parameter set
+
+        The derived object stores only the overridden parameters and shares
+        every other value (including the partners and their ``raw_pdb``) with
+        its parent, so no deep copy is made. Calling :meth:`set` on the
+        derived object never modifies the parent, while unchanged parameters
+        keep reflecting the parent values (in thread-safe mode, the values of
+        the parent at the time of the call).
+
+        :param overrides: Parameters to override, as ``name=value``
+        :return: Derived parameter set
+        :rtype: HADDOCKParam
+        :raise: HADDOCKParamError, HADDOCKParamFormatError
+        """
+        if not self.skip_validation:
+            self.check_status()
+        params = self.params
+        for param, value in overrides.items():
+            if param not in params:
+                raise HADDOCKParamError(f'Parameter "{param}" not found')
+            elif type(value).__name__ != self.key_types[param]:
+                raise HADDOCKParamFormatError(f"Wrong format: {type(value).__name__} instead of "
+                                              f"{self.key_types[param]}", param=param)
+
+        if isinstance(params, ChainMap):
+            params = params.new_child(overrides)
+        else:
+            params = ChainMap(overrides, params)
+
+        derived = self.__class__(verbose=self.verbose, thread_safe=self.thread_safe)
+        derived.path = self.path
+        derived.params = params
+        derived.skip_validation = self.skip_validation
+        derived.valid = self.valid
+        derived.loaded = self.loaded
+        return derived
+
+    def dumps(self):
+        """Serialize the parameter set to a JSON string
+
+        :return: JSON representation of the parameters
+        :rtype: str
+        """
+        self.check_status()
+        return json_backend.dumps(dict(self.params), indent=2, sort_keys=True, default=_json_default)
+
+    def dump(self, output):
+        """Write the parameter set to a JSON file
+
+        :param output: JSON file path or file-object
+        :type output: str, file
+        """
+        if isinstance(output, str):
+            with open(output, 'w') as jsonfh:
+                jsonfh.write(self.dumps())
+                jsonfh.write("\n")
+        else:
+            output.write(self.dumps())
+            output.write("\n")
+
+
+# Nested levels are checked by their own validators, compiled once
+HADDOCKParam.schema = SchemaLevel(HADDOCKParam.key_types, items={
+    'weights': ('list', 'float'),
+    'queues': SchemaLevel({'cns_exe': 'str', 'cpunumber': 'int', 'queue': 'str'}),
+    'centroids': SchemaLevel({'ambig': 'bool', 'coor': 'list'}, items={'coor': 'float'}),
+})
@@ -0,0 +1,327 @@
+"""
+Access to the parameter files stored in tar and zip archives, without extracting them.
+
+An archive member is designated by the path of the archive and the name of the
+member separated by ``::``, e.g. ``runs.tar.gz::run1/job_params.json``. The
+member name can be a shell pattern (``runs.tar.gz::*/job_params.json``) and an
+archive given alone stands for all its ``*.json`` members. Members are read from
+the archive straight into memory, no temporary file is written.
+
+Zip members and the members of uncompressed tar archives can be read
+independently, so :func:`map_files` lets each worker process read its own
+members. Compressed tar archives can only be decompressed sequentially: they are
+read once, in archive order, by the main process and only the processing of
+their members is done in parallel.
+"""
+
+import fnmatch
+import io
+import os
+import tarfile
+import threading
+import zipfile
+import zlib
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+SEP = '::'
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tbz', '.tar.xz', '.txz')
+ZIP_SUFFIXES = ('.zip',)
+# gzip, bzip2 and xz magic numbers
+_COMPRESSED_MAGIC = (b'\x1f\x8b', b'BZh', b'\xfd7zXZ\x00')
+
+# Archives kept open by the current process, see _open_archive()
+_archives = OrderedDict()
+_archives_lock = threading.RLock()
+_MAX_OPEN_ARCHIVES = 8
+
+
+class ArchiveError(ValueError):
+    """Raised when an archive or one of its members cannot be used"""
+
+
+def split_path(path):
+    """Split a path into the archive path and member name
+
+    :param str path: File path or ``archive::member``
+    :return: Path and member name, None if the path is not an archive member
+    :rtype: tuple(str, str)
+    """
+    archive, sep, member = path.partition(SEP)
+    return (archive, member) if sep else (path, None)
+
+
+def is_archive(path):
+    """Check from its name whether a file is a tar or zip archive
+
+    :param str path: File path
+    :rtype: bool
+    """
+    return path.lower().endswith(TAR_SUFFIXES + ZIP_SUFFIXES)
+
+
+def is_compressed_tar(path):
+    """Check whether a file is a compressed tar archive, which can only be read sequentially
+
+    :param str path: Archive path
+    :rtype: bool
+    """
+    if not path.lower().endswith(TAR_SUFFIXES):
+        return False
+    with open(path, 'rb') as fh:
+        return fh.read(6).startswith(_COMPRESSED_MAGIC)
+
+
+def _open_archive(path):
+    """Open an archive, or reuse the one already opened by this process"""
+    st = os.stat(path)
+    # Handles inherited from a parent process share its file offsets
+    key = (path, st.st_mtime_ns, st.st_size, os.getpid())
+    handle = _archives.get(key)
+    if handle is None:
+        try:
+            if path.lower().endswith(ZIP_SUFFIXES):
+                handle = zipfile.ZipFile(path)
+            else:
+                handle = tarfile.open(path, 'r:*')
+        except (tarfile.TarError, zipfile.BadZipFile) as e:
+            raise ArchiveError(f"Cannot read archive {path}: {e}")
+        _archives[key] = handle
+        if len(_archives) > _MAX_OPEN_ARCHIVES:
+            _, old = _archives.popitem(last=False)
+            old.close()
+    else:
+        _archives.move_to_end(key)
+    return handle
+
+
+def close_archives():
+    """Close the archives kept open by :func:`read_file`"""
+    with _archives_lock:
+        while _archives:
+            _archives.popitem()[1].close()
+
+
+def _visible(name):
+    return not os.path.basename(name.rstrip('/')).startswith('.')
+
+
+def list_members(path, pattern='*.json'):
+    """List the files of an archive matching a pattern
+
+    :param str path: Archive path
+    :param str pattern: Shell pattern matched against the full member names, hidden files are ignored
+    :return: Member names, in archive order
+    :rtype: list
+    :raise: ArchiveError
+    """
+    try:
+        if path.lower().endswith(ZIP_SUFFIXES):
+            with zipfile.ZipFile(path) as zf:
+                names = [info.filename for info in zf.infolist() if not info.is_dir()]
+        else:
+            # Stream mode only reads the headers once
+            with tarfile.open(path, 'r|*') as tf:
+                names = [info.name for info in tf if info.isfile()]
+    except (tarfile.TarError, zipfile.BadZipFile, EOFError) as e:
+        raise ArchiveError(f"Cannot read archive {path}: {e}")
+    return [name for name in names if _visible(name) and fnmatch.fnmatch(name, pattern)]
+
+
+def _single_member(path):
+    members = list_members(path)
+    if len(members) != 1:
+        raise ArchiveError(f"{len(members)} parameter files found in {path}, "
+                           f"use {path}{SEP}<member> to choose one")
+    return members[0]
+
+
+def read_file(path):
+    """Read a file or an archive member
+
+    :param str path: File path, ``archive::member``, or archive containing a single ``*.json`` file
+    :rtype: bytes
+    :raise: OSError, ArchiveError
+    """
+    archive, member = split_path(path)
+    if member is None and not is_archive(path):
+        with open(path, 'rb') as fh:
+            return fh.read()
+    if member is None:
+        member = _single_member(archive)
+    with _archives_lock:
+        handle = _open_archive(archive)
+        try:
+            if isinstance(handle, zipfile.ZipFile):
+                return handle.read(member)
+            fh = handle.extractfile(member)
+            if fh is None:
+                raise ArchiveError(f"{member} is not a file in {archive}")
+            return fh.read()
+        except KeyError:
+            raise FileNotFoundError(f"{member} not found in {archive}") from None
+        except (tarfile.TarError, zipfile.BadZipFile, EOFError) as e:
+            raise ArchiveError(f"Cannot read {member} from {archive}: {e}")
+
+
+def open_file(path):
+    """Open a file or an archive member for reading
+
+    :param str path: See :func:`read_file`
+    :return: Binary file-object
+    :raise: OSError, ArchiveError
+    """
+    if split_path(path)[1] is None and not is_archive(path):
+        return open(path, 'rb')
+    return io.BytesIO(read_file(path))
+
+
+def isfile(path):
+    """Check whether a path is an existing file or archive member
+
+    :param str path: File path or ``archive::member``
+    :rtype: bool
+    """
+    archive, member = split_path(path)
+    if member is None or not os.path.isfile(archive):
+        return os.path.isfile(path)
+    try:
+        with _archives_lock:
+            handle = _open_archive(archive)
+            if isinstance(handle, zipfile.ZipFile):
+                return not handle.getinfo(member).is_dir()
+            return handle.getmember(member).isfile()
+    except (KeyError, ArchiveError):
+        return False
+
+
+def expand(path, pattern='*.json'):
+    """Expand an archive or an archive member pattern into member paths
+
+    :param str path: Archive (members matching pattern), ``archive::pattern`` or any other path
+    :param str pattern: Shell pattern of the members of an archive given alone
+    :return: ``archive::member`` paths, or [path] if path is not an archive nor a member pattern
+    :rtype: list
+    :raise: ArchiveError
+    """
+    archive, member = split_path(path)
+    if member is None:
+        if not is_archive(path) or not os.path.isfile(path):
+            return [path]
+        member = pattern
+    elif not any(c in member for c in '*?['):
+        return [path]
+    return [f'{archive}{SEP}{name}' for name in list_members(archive, member)]
+
+
+def _read_tasks(paths):
+    """Yield (index, path, data, error) tasks, data being None when the member can be read by a worker"""
+    streamed = defaultdict(dict)
+    for i, path in enumerate(paths):
+        archive, member = split_path(path)
+        try:
+            sequential = member is not None and is_compressed_tar(archive)
+        except OSError:
+            sequential = False
+        if sequential:
+            streamed[archive][member] = i
+        else:
+            yield i, path, None, None
+    for archive, members in streamed.items():
+        try:
+            with tarfile.open(archive, 'r|*') as tf:
+                for info in tf:
+                    i = members.get(info.name)
+                    if i is None:
+                        continue
+                    if info.isfile():
+                        data, error = tf.extractfile(info).read(), None
+                    else:
+                        data, error = None, f"{info.name} is not a file in {archive}"
+                    # Only done once read, the members left get an error if the archive is corrupted
+                    del members[info.name]
+                    yield i, paths[i], data, error
+        except (tarfile.TarError, EOFError, OSError, zlib.error) as e:
+            for member, i in members.items():
+                yield i, paths[i], None, f"Cannot read {member} from {archive}: {e}"
+            continue
+        for member, i in members.items():
+            yield i, paths[i], None, f"{member} not found in {archive}"
+
+
+def iter_files(paths):
+    """Read files and archive members, each compressed tar archive being read once
+
+    :param list paths: File paths or ``archive::member`` paths
+    :return: Triplets of path, content (None on error) and error message, grouped by archive
+    :rtype: iterator
+    """
+    for _, path, data, error in _read_tasks(paths):
+        if data is None and error is None:
+            try:
+                data = read_file(path)
+            except (OSError, ArchiveError) as e:
+                error = str(e)
+        yield path, data, error
+
+
+def _apply(func, tasks):
+    results = []
+    for i, path, data, error in tasks:
+        if data is None and error is None:
+            try:
+                data = read_file(path)
+            except (OSError, ArchiveError) as e:
+                error = str(e)
+        results.append((i, func(path, data, error)))
+    return results
+
+
+def map_files(func, paths, workers=None, callback=None):
+    """Apply a function to the content of files and archive members, in parallel processes
+
+    :param func: Picklable function called as ``func(path, data, error)``, ``data`` being the content
+        of the file (None on read error) and ``error`` the read error message
+    :param list paths: File paths or ``archive::member`` paths
+    :param int workers: Number of processes, one per CPU if not given, no parallelism if 1
+    :param callback: Function called as ``callback(index, result)`` as soon as each result is
+        available, in any order
+    :return: Results of func, in the order of paths
+    :rtype: list
+    """
+    if workers is None:
+        workers = min(os.cpu_count() or 1, max(len(paths) // 16, 1))
+    results = [None] * len(paths)
+    if workers <= 1:
+        for i, result in _apply(func, _read_tasks(paths)):
+            results[i] = result
+            if callback is not None:
+                callback(i, result)
+        return results
+
+    chunksize = min(max(len(paths) // (workers * 4), 1), 64)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        chunk = []
+
+        def collect(return_when):
+            nonlocal pending
+            done, pending = wait(pending, return_when=return_when)
+            for future in done:
+                for i, result in future.result():
+                    results[i] = result
+                    if callback is not None:
+                        callback(i, result)
+
+        for task in _read_tasks(paths):
+            chunk.append(task)
+            if len(chunk) >= chunksize:
+                pending.add(executor.submit(_apply, func, chunk))
+                chunk = []
+                # Bound the number of members read ahead of the workers
+                if len(pending) >= workers * 2:
+                    collect(FIRST_COMPLETED)
+        if chunk:
+            pending.add(executor.submit(_apply, func, chunk))
+        collect(ALL_COMPLETED)
+    return results
@@ -0,0 +1,126 @@
+"""
+Assembly of parameter files from a template and PDB files.
+
+The template parameters are written as usual while the content of the PDB
+files is streamed, JSON-escaped by chunks, straight into the ``raw_pdb``
+fields of the output. Large complexes are assembled with a memory usage
+bounded by the chunk size, and the output is identical to the one of
+:meth:`param_to_json.HADDOCKParam.dumps`.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import uuid
+
+from . import HADDOCKParam, HADDOCKParamError, Partner, _json_default, json_backend, wire
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def _partner_from_template(base, pdb, segid=None):
+    """Create the partner entry of a PDB file from a template partner"""
+    fields = {k: base[k] for k in base if k != 'raw_pdb'}
+    root = os.path.splitext(os.path.basename(pdb))[0]
+    fields.update(pdb_file=os.path.basename(pdb), root=root, psf_file=f'{root}.psf')
+    if segid:
+        fields['segid'] = segid
+    return Partner(**fields)
+
+
+def build_partners(template, pdbs):
+    """Create the partners of the PDB files, without their content
+
+    The n-th PDB file uses the n-th partner of the template, extra PDB files use
+    the last one with a new segid. ``pdb_file``, ``root`` and ``psf_file`` are
+    derived from the name of the PDB file.
+
+    :param HADDOCKParam template: Template parameters, with at least one partner
+    :param list pdbs: Paths of the PDB files
+    :return: Partners indexed by partner number
+    :rtype: dict
+    :raise: HADDOCKParamError
+    """
+    bases = [p for _, p in sorted(template.get('partners').items(), key=lambda item: int(item[0]))]
+    if not bases:
+        raise HADDOCKParamError("The template must define at least one partner")
+    if len(pdbs) > 20:
+        logging.warning("More than 20 partners defined, HADDOCK currently supports up to 20 partners")
+    used = {getattr(b, 'segid', None) for b in bases[:len(pdbs)]}
+    free = (chr(c) for c in range(ord('A'), ord('Z') + 1) if chr(c) not in used)
+    partners = {}
+    for i, pdb in enumerate(pdbs):
+        if i < len(bases):
+            partners[str(i + 1)] = _partner_from_template(bases[i], pdb)
+        else:
+            partners[str(i + 1)] = _partner_from_template(bases[-1], pdb, segid=next(free, None))
+    return partners
+
+
+def _write_pdb(out, pdb, chunk_size):
+    out.write('"')
+    with open(pdb, 'r', encoding='utf-8', newline='') as fh:
+        while True:
+            chunk = fh.read(chunk_size)
+            if not chunk:
+                break
+            # Same escaping as the json module (ensure_ascii), without the quotes
+            out.write(json.dumps(chunk)[1:-1])
+    out.write('"')
+
+
+def build(template, pdbs, output, chunk_size=CHUNK_SIZE, binary=False):
+    """Write a parameter file made of a template and PDB files
+
+    :param template: Template parameters, see :func:`build_partners`
+    :type template: HADDOCKParam, str
+    :param list pdbs: Paths of the PDB files, one per partner
+    :param output: Output JSON file path or text file-object, binary file-object if binary is set
+    :type output: str, file
+    :param int chunk_size: Number of characters of PDB read at once
+    :param bool binary: Write the binary format of :mod:`param_to_json.wire` instead of JSON
+    :raise: HADDOCKParamError
+    """
+    if isinstance(template, str):
+        path = template
+        template = HADDOCKParam()
+        template.load(path)
+    for pdb in pdbs:
+        if not os.path.isfile(pdb):
+            raise HADDOCKParamError(f"PDB file not found: {pdb}")
+
+    partners = build_partners(template, pdbs)
+    if binary:
+        params = dict(template.params, partners=partners)
+        # The PDB files are copied as is after the header
+        output.write(wire.encode_header(params, [(i, os.path.getsize(pdb)) for i, pdb in zip(partners, pdbs)]))
+        for pdb in pdbs:
+            with open(pdb, 'rb') as fh:
+                shutil.copyfileobj(fh, output, chunk_size)
+        return
+
+    # Unique markers replaced by the PDB content when writing
+    token = uuid.uuid4().hex
+    for i, partner in partners.items():
+        partner.raw_pdb = f'@{token}:{i}@'
+    params = dict(template.params)
+    params['partners'] = partners
+    text = json_backend.dumps(params, indent=2, sort_keys=True, default=_json_default)
+    pieces = re.split(f'"@{token}:(\\d+)@"', text)
+
+    if isinstance(output, str):
+        with open(output, 'w') as out:
+            _write_pieces(out, pieces, pdbs, chunk_size)
+    else:
+        _write_pieces(output, pieces, pdbs, chunk_size)
+
+
+def _write_pieces(out, pieces, pdbs, chunk_size):
+    # pieces alternates template text and partner numbers
+    out.write(pieces[0])
+    for i in range(1, len(pieces), 2):
+        _write_pdb(out, pdbs[int(pieces[i]) - 1], chunk_size)
+        out.write(pieces[i + 1])
+    out.write('\n')
@@ -0,0 +1,250 @@
+"""
+Column-wise access to many HADDOCK parameter sets.
+
+A :class:`HADDOCKParamCollection` holds loaded :class:`param_to_json.HADDOCKParam`
+objects and reads or writes one parameter across all of them at once, the
+status and type checks being done once per collection or column instead of
+once per object. Columns of numbers are returned as typed arrays.
+"""
+
+import io
+import logging
+from array import array
+from collections import ChainMap
+from functools import partial
+
+from . import HADDOCKParam, HADDOCKParamError, HADDOCKParamFormatError, ParamPath, archive, compile_path
+from .spill import SpillStore
+from .spool import list_files
+
+# Typecodes of the arrays returned for the columns of integers and floats
+_TYPECODES = {'int': 'q', 'float': 'd'}
+
+
+def _load_data(path, data, error, skip_validation, verbose):
+    if error is not None:
+        return None, error
+    params = HADDOCKParam(verbose=verbose)
+    try:
+        params.load(io.BytesIO(data), skip_validation=skip_validation)
+    except (HADDOCKParamError, HADDOCKParamFormatError) as e:
+        return None, str(e).strip().replace('\n', ' ')
+    params.path = path
+    return params, None
+
+
+class HADDOCKParamCollection(object):
+    """
+    Collection of parameter sets with column-wise access.
+
+    :param params: Loaded parameter sets
+    :type params: iterable of HADDOCKParam
+    :param bool verbose: Get validation details and warnings when loading files
+    :param int memory_budget: Memory allowed for the PDB contents of the partners, in bytes, the least
+        recently used ones being spilled to disk past it, see :class:`param_to_json.spill.SpillStore`
+    :raise: HADDOCKParamError, HADDOCKParamFormatError if a parameter set is not loaded or not valid
+    """
+
+    def __init__(self, params=(), verbose=True, memory_budget=None):
+        self.verbose = verbose
+        self.params = []
+        self.spill = SpillStore(memory_budget) if memory_budget is not None else None
+        # Files that could not be loaded, as pairs of path and error message
+        self.errors = []
+        self.extend(params)
+
+    def extend(self, params):
+        """Add parameter sets to the collection
+
+        :param params: Loaded parameter sets
+        :type params: iterable of HADDOCKParam
+        :raise: HADDOCKParamError, HADDOCKParamFormatError
+        """
+        params = list(params)
+        for p in params:
+            if not p.skip_validation:
+                p.check_status()
+        self.params.extend(params)
+        self._track(params)
+
+    def load(self, inputs, skip_validation=False, workers=None):
+        """Load parameter files into the collection, in parallel processes
+
+        Files that cannot be loaded are skipped and listed in :attr:`errors`.
+
+        :param inputs: Files, directories, glob patterns or archives, see :func:`param_to_json.spool.list_files`
+        :type inputs: list
+        :param bool skip_validation: Flag to skip or not the validation step
+        :param int workers: Number of processes, one per CPU if not given, no parallelism if 1
+        :return: Number of parameter sets loaded
+        :rtype: int
+        """
+        paths = list_files([inputs] if isinstance(inputs, str) else inputs)
+        func = partial(_load_data, skip_validation=skip_validation, verbose=self.verbose)
+
+        def track(i, result):
+            # Keep the memory budget while the files are being loaded
+            if result[0] is not None:
+                self._track([result[0]])
+
+        callback = track if self.spill is not None else None
+        loaded = []
+        for path, (params, error) in zip(paths, archive.map_files(func, paths, workers=workers, callback=callback)):
+            if params is None:
+                logging.warning(f"{path} skipped: {error}")
+                self.errors.append((path, error))
+            else:
+                loaded.append(params)
+        self.params.extend(loaded)
+        return len(loaded)
+
+    def _track(self, params):
+        if self.spill is not None:
+            for p in params:
+                self.spill.track(p.params.get('partners') or {})
+
+    @property
+    def paths(self):
+        """Paths of the parameter sets"""
+        return [p.path for p in self.params]
+
+    def __len__(self):
+        return len(self.params)
+
+    def __iter__(self):
+        return iter(self.params)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._subset(self.params[index])
+        return self.params[index]
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({len(self.params)} parameter sets)"
+
+    def _subset(self, items):
+        subset = self.__class__(verbose=self.verbose)
+        subset.params = items
+        subset.spill = self.spill
+        return subset
+
+    def _values(self, param):
+        """Values of a parameter in every parameter set, as a list"""
+        if isinstance(param, str) and ('.' in param or '[' in param) and param not in HADDOCKParam.key_types:
+            param = compile_path(param)
+        if isinstance(param, ParamPath):
+            return [param.get(p.params) for p in self.params]
+        try:
+            return [p.params[param] for p in self.params]
+        except KeyError:
+            raise HADDOCKParamError(f'Parameter "{param}" not found') from None
+
+    def get(self, param):
+        """Get the values of a parameter in all the parameter sets
+
+        :param param: Name of the parameter, or path to a nested parameter, see :class:`param_to_json.ParamPath`
+        :type param: str, ParamPath
+        :return: Values, in the order of the collection, as ``array('q')`` for integers,
+            ``array('d')`` for floats and as a list otherwise
+        :rtype: array, list
+        :raise: HADDOCKParamError
+        """
+        values = self._values(param)
+        types = set(map(type, values))
+        if len(types) == 1:
+            typecode = _TYPECODES.get(types.pop().__name__)
+            if typecode:
+                try:
+                    return array(typecode, values)
+                except OverflowError:
+                    pass
+        return values
+
+    def _check_column(self, param, values, current):
+        """Check the type of a whole column against the schema, or the current values"""
+        path = param if isinstance(param, ParamPath) else compile_path(param)
+        if isinstance(values, array):
+            kind = 'float' if values.typecode in 'fd' else 'int' if values.typecode != 'u' else 'str'
+            types = {kind}
+            values = values.tolist()
+        else:
+            values = list(values)
+            types = {type(v).__name__ for v in values}
+        if len(values) != len(self.params):
+            raise HADDOCKParamError(f"{len(values)} values given for {len(self.params)} parameter sets")
+        expected = {path.leaf_type} if path.leaf_type else {type(v).__name__ for v in current}
+        if not values:
+            return path, values
+        if len(expected) != 1 or types != expected:
+            found = ', '.join(sorted(types))
+            raise HADDOCKParamFormatError(f"Wrong format: {found} instead of {', '.join(sorted(expected))}",
+                                          param=path.path)
+        if path.item_type:
+            item_types = {type(item).__name__ for v in values for item in v}
+            if item_types - {path.item_type}:
+                raise HADDOCKParamFormatError(f"Wrong format: list of {', '.join(sorted(item_types))} instead of "
+                                              f"list of {path.item_type}", param=path.path)
+        return path, values
+
+    def set(self, param, values):
+        """Set the values of a parameter in all the parameter sets
+
+        The type of the values is checked once for the whole column.
+
+        :param param: Name of the parameter, or path to a nested parameter, see :class:`param_to_json.ParamPath`
+        :type param: str, ParamPath
+        :param values: New values, one per parameter set in the order of the collection
+        :type values: list, array
+        :raise: HADDOCKParamError, HADDOCKParamFormatError
+        """
+        # Also checks that the parameter exists in every parameter set
+        current = self._values(param)
+        path, values = self._check_column(param, values, current)
+        top = len(path.steps) == 1
+        for p, value in zip(self.params, values):
+            if p.thread_safe:
+                p.set(path, value)
+            elif top:
+                p.params[path.path] = value
+            else:
+                path.set(p.params, value, cow=isinstance(p.params, ChainMap), check=False)
+
+    def _mask(self, conditions):
+        mask = [True] * len(self.params)
+        for param, condition in conditions.items():
+            values = self._values(param)
+            if callable(condition):
+                keep = [bool(condition(v)) for v in values]
+            else:
+                keep = [v == condition for v in values]
+            mask = [m and k for m, k in zip(mask, keep)]
+        return mask
+
+    def filter(self, conditions=None, **kwargs):
+        """Select the parameter sets matching conditions on parameter values
+
+        :param dict conditions: Conditions by parameter name or path, a condition being either a value
+            (equality) or a function of the value returning True for the parameter sets to keep
+        :param kwargs: Conditions on parameters given as ``name=condition``
+        :return: New collection sharing the selected parameter sets
+        :rtype: HADDOCKParamCollection
+        :raise: HADDOCKParamError
+        """
+        conditions = dict(conditions or {}, **kwargs)
+        return self._subset([p for p, keep in zip(self.params, self._mask(conditions)) if keep])
+
+    def groupby(self, param):
+        """Group the parameter sets by the value of a scalar parameter
+
+        :param param: Name of the parameter, or path to a nested parameter, see :class:`param_to_json.ParamPath`
+        :type param: str, ParamPath
+        :return: Collections sharing the parameter sets, by value in order of first appearance
+        :rtype: dict
+        :raise: HADDOCKParamError
+        """
+        groups = {}
+        for p, value in zip(self.params, self._values(param)):
+            if not isinstance(value, (str, int, float, bool)):
+                raise HADDOCKParamError(f'Cannot group by "{param}", {type(value).__name__} is not a scalar type')
+            groups.setdefault(value, []).append(p)
+        return {value: self._subset(items) for value, items in groups.items()}
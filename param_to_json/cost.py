@@ -0,0 +1,187 @@
+"""
+Estimation of the computing cost of a HADDOCK run from its parameter file.
+
+The cost is modelled as a linear function of the work done at each stage of
+the protocol, the work of a stage being its number of models times the number
+of steps per model times the number of atoms of the complex:
+
+- ``models``: ``structures_0 + structures_1 + waterrefine`` (per-model overhead)
+- ``it0``: ``structures_0 * ntrials * atoms`` (rigid-body docking)
+- ``it1``: ``structures_1 * (initiosteps + cool1_steps + cool2_steps + cool3_steps) * atoms``
+  (semi-flexible refinement)
+- ``itw``: ``waterrefine * (waterheatsteps + watersteps + watercoolsteps) * atoms``
+  (refinement in explicit solvent)
+
+The default coefficients are rough figures, :meth:`CostModel.fit` calibrates
+them against the CPU-hours actually consumed by previous runs.
+"""
+
+from collections import namedtuple
+from functools import partial
+
+from . import HADDOCKParam, HADDOCKParamError, archive, json_backend
+
+FEATURES = ('models', 'it0', 'it1', 'itw')
+
+CostEstimate = namedtuple('CostEstimate', ['cpu_hours', 'wall_hours', 'cpus', 'features'])
+CostEstimate.__doc__ = """Estimated cost of a run: CPU-hours, wall-clock hours on ``cpus`` CPUs and model features"""
+
+
+def count_atoms(pdb):
+    """Count the ATOM and HETATM records of a PDB file content
+
+    :param str pdb: Content of the PDB file
+    :rtype: int
+    """
+    count = pdb.count('\nATOM  ') + pdb.count('\nHETATM')
+    if pdb.startswith(('ATOM  ', 'HETATM')):
+        count += 1
+    return count
+
+
+def cost_features(params):
+    """Compute the features of the cost model for a parameter set
+
+    :param params: Parameters
+    :type params: HADDOCKParam, dict
+    :return: Features of the model, see :data:`FEATURES`, and the number of CPUs
+    :rtype: tuple(dict, int)
+    :raise: HADDOCKParamError
+    """
+    if isinstance(params, HADDOCKParam):
+        params = params.params
+    try:
+        atoms = sum(count_atoms(p['raw_pdb']) for p in params['partners'].values())
+        it0 = params['structures_0']
+        it1 = params['structures_1']
+        itw = params['waterrefine']
+        features = {
+            'models': it0 + it1 + itw,
+            'it0': it0 * params['ntrials'] * atoms,
+            'it1': it1 * sum(params[k] for k in ('initiosteps', 'cool1_steps', 'cool2_steps', 'cool3_steps')) * atoms,
+            'itw': itw * (params['waterheatsteps'] + params['watersteps'] + params['watercoolsteps']) * atoms,
+        }
+        cpus = sum(q['cpunumber'] for q in params['queues'])
+    except (KeyError, TypeError, AttributeError) as e:
+        # e.g. partners given as a list, raw_pdb set to null
+        raise HADDOCKParamError(f"Cannot estimate cost, missing or wrong parameter: {e}")
+    return features, max(cpus, 1)
+
+
+class CostModel(object):
+    """
+    Linear model of the CPU-hours consumed by a HADDOCK run.
+
+    :param dict coefficients: CPU-hours per unit of each feature, and ``intercept``
+    """
+
+    default_coefficients = {'intercept': 0.1, 'models': 5.6e-4, 'it0': 4.4e-7, 'it1': 2.2e-8, 'itw': 5.7e-8}
+
+    def __init__(self, coefficients=None):
+        self.coefficients = dict(self.default_coefficients)
+        if coefficients:
+            unknown = set(coefficients) - set(self.default_coefficients)
+            if unknown:
+                raise HADDOCKParamError(f"Unknown cost coefficients: {', '.join(sorted(unknown))}")
+            self.coefficients.update(coefficients)
+
+    @classmethod
+    def load(cls, path):
+        """Load coefficients from a JSON file
+
+        :param str path: JSON file written by :meth:`save`
+        :rtype: CostModel
+        """
+        with open(path, 'rb') as fh:
+            return cls(json_backend.load(fh))
+
+    def save(self, path):
+        """Write the coefficients to a JSON file
+
+        :param str path: Output file
+        """
+        with open(path, 'w') as fh:
+            fh.write(json_backend.dumps(self.coefficients, indent=2, sort_keys=True))
+            fh.write('\n')
+
+    def predict(self, features):
+        """Compute the CPU-hours corresponding to a set of features
+
+        :param dict features: Features, see :func:`cost_features`
+        :rtype: float
+        """
+        c = self.coefficients
+        return c['intercept'] + sum(c[f] * features[f] for f in FEATURES)
+
+    def estimate(self, params):
+        """Estimate the cost of a run
+
+        :param params: Parameters
+        :type params: HADDOCKParam, dict
+        :rtype: CostEstimate
+        :raise: HADDOCKParamError
+        """
+        features, cpus = cost_features(params)
+        cpu_hours = self.predict(features)
+        return CostEstimate(cpu_hours, cpu_hours / cpus, cpus, features)
+
+    @classmethod
+    def fit(cls, runs):
+        """Fit the coefficients on the CPU-hours consumed by previous runs (least squares)
+
+        :param runs: Pairs of parameters (HADDOCKParam or dict) and CPU-hours consumed
+        :type runs: iterable
+        :rtype: CostModel
+        :raise: HADDOCKParamError
+        """
+        names = ('intercept',) + FEATURES
+        rows, targets = [], []
+        for params, cpu_hours in runs:
+            features = cost_features(params)[0]
+            rows.append([1.0] + [float(features[f]) for f in FEATURES])
+            targets.append(float(cpu_hours))
+        if len(rows) < len(names):
+            raise HADDOCKParamError(f"At least {len(names)} runs are needed to fit the cost model")
+
+        # Scale the columns to keep the normal equations well conditioned
+        n = len(names)
+        scales = [max(abs(row[j]) for row in rows) or 1.0 for j in range(n)]
+        rows = [[row[j] / scales[j] for j in range(n)] for row in rows]
+        # Normal equations, as an augmented matrix
+        a = [[sum(row[i] * row[j] for row in rows) for j in range(n)] for i in range(n)]
+        for i in range(n):
+            a[i].append(sum(row[i] * y for row, y in zip(rows, targets)))
+        # Gauss-Jordan elimination with partial pivoting
+        for col in range(n):
+            pivot = max(range(col, n), key=lambda r: abs(a[r][col]))
+            if abs(a[pivot][col]) < 1e-12:
+                raise HADDOCKParamError("Cannot fit the cost model, the runs are too similar "
+                                        "(e.g. same number of models)")
+            a[col], a[pivot] = a[pivot], a[col]
+            for r in range(n):
+                if r != col:
+                    factor = a[r][col] / a[col][col]
+                    a[r] = [x - factor * y for x, y in zip(a[r], a[col])]
+        return cls({name: a[i][n] / a[i][i] / scales[i] for i, name in enumerate(names)})
+
+
+def _estimate_data(path, data, error, coefficients):
+    if error is not None:
+        return path, None, error
+    try:
+        return path, CostModel(coefficients).estimate(json_backend.loads(data)), None
+    except (ValueError, HADDOCKParamError) as e:
+        return path, None, str(e).strip()
+
+
+def estimate_files(paths, model=None, workers=None):
+    """Estimate the cost of many parameter files, without validating them
+
+    :param list paths: Parameter files or archive members, see :mod:`param_to_json.archive`
+    :param CostModel model: Cost model, default coefficients if not given
+    :param int workers: Number of processes, one per CPU if not given, no parallelism if 1
+    :return: Triplets of path, estimate (None on error) and error message, in the order of paths
+    :rtype: list
+    """
+    coefficients = (model or CostModel()).coefficients
+    return archive.map_files(partial(_estimate_data, coefficients=coefficients), paths, workers=workers)
@@ -0,0 +1,176 @@
+"""
+JSON backend used to decode and encode HADDOCK parameter files.
+
+Faster JSON libraries are detected at runtime and used when available
+(``orjson`` for decoding and encoding, ``ujson`` for decoding only),
+otherwise the standard library ``json`` module is used. The choice can
+be forced through the ``HADDOCK_PARAM_JSON`` environment variable
+(``auto``, ``orjson``, ``ujson`` or ``json``) or :func:`select_backend`.
+
+The functions mimic the subset of the ``json`` module used in this
+package so that it can be imported as a drop-in replacement. Pretty
+output (``indent=2``) is guaranteed to be byte-identical to the one of
+the standard library.
+"""
+
+import json
+import logging
+import os
+from collections.abc import Mapping
+from json import JSONDecodeError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+__all__ = ['JSONDecodeError', 'BACKENDS', 'available_backends', 'select_backend', 'load', 'loads', 'dumps']
+
+ENV_VAR = 'HADDOCK_PARAM_JSON'
+BACKENDS = ('orjson', 'ujson', 'json')
+
+# Backend currently in use, set by select_backend()
+backend = 'json'
+
+
+def available_backends():
+    """List the JSON backends that can be used, fastest first
+
+    :rtype: list
+    """
+    modules = {'orjson': orjson, 'ujson': ujson, 'json': json}
+    return [name for name in BACKENDS if modules[name] is not None]
+
+
+def select_backend(name=None):
+    """Select the JSON backend to use
+
+    :param str name: ``auto``, ``orjson``, ``ujson`` or ``json``. Defaults to the
+        value of the ``HADDOCK_PARAM_JSON`` environment variable, or ``auto``
+    :return: Name of the selected backend
+    :rtype: str
+    """
+    global backend
+    if name is None:
+        name = os.environ.get(ENV_VAR, 'auto')
+    name = name.strip().lower() or 'auto'
+    available = available_backends()
+    if name == 'auto':
+        backend = available[0]
+    elif name in available:
+        backend = name
+    else:
+        if name not in BACKENDS:
+            logging.warning(f"Unknown JSON backend {name}, expected one of auto, {', '.join(BACKENDS)}")
+        else:
+            logging.warning(f"JSON backend {name} is not installed")
+        backend = available[0]
+    return backend
+
+
+def _big_floats(obj):
+    """Check whether obj holds floats beyond 64-bit integers, which may be integers decoded as floats"""
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        item_type = type(item)
+        if item_type is float:
+            if abs(item) >= 2.0 ** 63:
+                return True
+        elif item_type is dict:
+            stack.extend(item.values())
+        elif item_type is list:
+            stack.extend(item)
+    return False
+
+
+def loads(s):
+    """Decode a JSON document
+
+    Documents the fast backends cannot decode like the json module (non-finite
+    numbers, integers larger than 64 bits) are decoded by the json module.
+
+    :param s: JSON document
+    :type s: str, bytes
+    :raise: JSONDecodeError
+    """
+    if backend != 'json':
+        try:
+            obj = orjson.loads(s) if backend == 'orjson' else ujson.loads(s)
+        except ValueError:
+            # e.g. NaN or Infinity, written by the json module by default
+            pass
+        else:
+            # Integers larger than 64 bits are decoded as floats
+            if not _big_floats(obj):
+                return obj
+    return json.loads(s)
+
+
+def load(fh):
+    """Decode a JSON document from a file-object
+
+    :param fh: Text or binary file-object
+    :raise: JSONDecodeError
+    """
+    return loads(fh.read())
+
+
+def _orjson_compatible(obj):
+    """Check that orjson formats all numbers of obj like the json module does"""
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        item_type = type(item)
+        if item_type is float:
+            # Exponent notation (used by repr() outside of [1e-4, 1e16)) and
+            # non-finite values are written differently
+            if item and not 1e-4 <= abs(item) < 1e16:
+                return False
+        elif item_type is dict:
+            stack.extend(item.values())
+        elif item_type is list or item_type is tuple:
+            stack.extend(item)
+        elif item_type is not str and item_type is not int and item_type is not bool \
+                and isinstance(item, Mapping):
+            stack.extend(item.values())
+    return True
+
+
+def dumps(obj, indent=None, sort_keys=False, default=None):
+    """Encode obj as a JSON document
+
+    :param obj: Object to encode
+    :param int indent: Indentation level, only ``None`` and ``2`` use the fast backend
+    :param bool sort_keys: Sort the keys of dictionaries
+    :param default: Function returning a serializable version of unsupported objects
+    :rtype: str
+    """
+    if backend == 'orjson' and indent in (None, 2):
+        option = orjson.OPT_SORT_KEYS if sort_keys else 0
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            out = orjson.dumps(obj, default=default, option=option)
+        except TypeError:
+            # e.g. integers larger than 64 bits or non-string keys, let the json module deal with them
+            out = None
+        if out is not None:
+            if indent is None:
+                return out.decode()
+            # The json module escapes any non-ASCII character and DEL
+            try:
+                text = out.decode('ascii')
+            except UnicodeDecodeError:
+                text = None
+            if text is not None and '\x7f' not in text and _orjson_compatible(obj):
+                return text
+    return json.dumps(obj, indent=indent, sort_keys=sort_keys, default=default)
+
+
+select_backend()
@@ -0,0 +1,129 @@
+"""
+Planning of the CPUs used by a batch of HADDOCK runs sharing a cluster.
+
+The work of each run is estimated with :class:`param_to_json.cost.CostModel`
+and the available cores are shared proportionally to it, so that all the runs
+end at the same time, which minimizes the makespan of the batch. A run never
+gets more CPUs than models generated at its first stage (``structures_0``),
+nor than an optional limit per run, the cores left being shared among the
+other runs.
+"""
+
+import logging
+import math
+from collections import namedtuple
+
+from .cost import CostModel
+
+RunPlan = namedtuple('RunPlan', ['cpu_hours', 'cpus_before', 'cpus_after', 'wall_hours'])
+RunPlan.__doc__ = """Plan of a run: estimated CPU-hours, CPUs before and after planning and estimated wall-clock hours"""
+
+
+def split_cpus(total, weights, minimum=1):
+    """Split an integer number of CPUs proportionally to weights (largest remainder method)
+
+    :param int total: Number of CPUs to split
+    :param list weights: Weights of the parts
+    :param int minimum: Minimum number of CPUs of each part, the total can be exceeded to honor it
+    :rtype: list
+    """
+    if not weights:
+        return []
+    weight_sum = sum(weights)
+    if weight_sum <= 0:
+        weights = [1] * len(weights)
+        weight_sum = len(weights)
+    shares = [total * w / weight_sum for w in weights]
+    parts = [max(int(math.floor(s)), minimum) for s in shares]
+    left = total - sum(parts)
+    for i in sorted(range(len(shares)), key=lambda i: parts[i] - shares[i])[:max(left, 0)]:
+        parts[i] += 1
+    return parts
+
+
+def allocate_cpus(works, cores, limits=None):
+    """Share cores between runs proportionally to their work, so that they end at the same time
+
+    :param list works: Work of each run (e.g. CPU-hours)
+    :param int cores: Number of cores available
+    :param list limits: Maximum number of CPUs of each run
+    :return: Number of CPUs of each run, at least 1
+    :rtype: list
+    """
+    n = len(works)
+    if not n:
+        return []
+    if n > cores:
+        logging.warning(f"More runs ({n}) than cores ({cores}), the cluster will be oversubscribed")
+    limits = [max(int(limit), 1) for limit in limits] if limits else [cores] * n
+    # Runs without work still need a CPU
+    works = [max(w, 1e-9) for w in works]
+    shares = [0.0] * n
+    active = set(range(n))
+    remaining = float(cores)
+    # Water-filling: runs reaching their limit are capped and the others share what is left
+    while active:
+        total = sum(works[i] for i in active)
+        capped = [i for i in active if works[i] / total * remaining >= limits[i]]
+        if not capped:
+            for i in active:
+                shares[i] = works[i] / total * remaining
+            break
+        for i in capped:
+            shares[i] = limits[i]
+            remaining -= limits[i]
+            active.remove(i)
+
+    cpus = [min(max(int(math.floor(s)), 1), limits[i]) for i, s in enumerate(shares)]
+    left = cores - sum(cpus)
+    for i in sorted(range(n), key=lambda i: cpus[i] - shares[i]):
+        if left <= 0:
+            break
+        if cpus[i] < limits[i] and shares[i] > cpus[i]:
+            cpus[i] += 1
+            left -= 1
+    return cpus
+
+
+def makespan(works, cpus, cores):
+    """Estimate the time needed to run all the runs on the cluster
+
+    :param list works: Work of each run, in CPU-hours
+    :param list cpus: Number of CPUs of each run
+    :param int cores: Number of cores of the cluster
+    :return: Estimated makespan in hours
+    :rtype: float
+    """
+    if not works:
+        return 0.0
+    return max(max(w / max(c, 1) for w, c in zip(works, cpus)), sum(works) / cores)
+
+
+def plan_runs(runs, cores, model=None, max_per_run=None):
+    """Plan the CPUs of a batch of runs and rewrite the ``cpunumber`` of their queues
+
+    The CPUs of a run are split between its queues proportionally to their previous ``cpunumber``.
+
+    :param list runs: Parameters of the runs (HADDOCKParam), modified in place
+    :param int cores: Number of cores available for the batch
+    :param CostModel model: Cost model used to estimate the work of the runs
+    :param int max_per_run: Maximum number of CPUs of a run
+    :return: Plan of each run and estimated makespans before and after planning
+    :rtype: tuple(list, float, float)
+    """
+    model = model or CostModel()
+    estimates = [model.estimate(run) for run in runs]
+    works = [e.cpu_hours for e in estimates]
+    limits = [min(run.get('structures_0'), max_per_run or cores) for run in runs]
+    cpus = allocate_cpus(works, cores, limits)
+
+    plans = []
+    for run, estimate, work, n in zip(runs, estimates, works, cpus):
+        queues = run.get('queues')
+        for i, q_cpus in enumerate(split_cpus(n, [q['cpunumber'] for q in queues])):
+            run.set(f'queues.{i}.cpunumber', q_cpus)
+        n = sum(q['cpunumber'] for q in run.get('queues'))
+        plans.append(RunPlan(work, estimate.cpus, n, work / max(n, 1)))
+    before = makespan(works, [e.cpus for e in estimates], cores)
+    after = makespan(works, [p.cpus_after for p in plans], cores)
+    return plans, before, after
@@ -0,0 +1,65 @@
+"""
+Memory accounting of the operations performed on parameter files.
+
+Memory is measured with :mod:`tracemalloc`, only allocations made by
+Python are taken into account. For each operation, two values are
+reported: the peak of memory allocated while it runs and the memory
+still allocated when it returns (e.g. the loaded parameters).
+"""
+
+import tracemalloc
+
+
+class MemoryUsage(object):
+    """
+    Context manager measuring the memory allocated by the block it wraps.
+
+    Measurements cannot be nested, the peak being reset when entering the block.
+
+    :param str label: Name of the operation, used when printing the measure
+    :ivar int peak: Peak of memory allocated during the block, in bytes
+    :ivar int retained: Memory still allocated at the end of the block, in bytes
+    """
+
+    def __init__(self, label=''):
+        self.label = label
+        self.peak = 0
+        self.retained = 0
+        self._started = False
+        self._baseline = 0
+
+    def __enter__(self):
+        self._started = not tracemalloc.is_tracing()
+        if self._started:
+            tracemalloc.start()
+        elif hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        else:
+            # Python < 3.9, restarting the tracing resets the peak
+            tracemalloc.stop()
+            tracemalloc.start()
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        current, peak = tracemalloc.get_traced_memory()
+        if self._started:
+            tracemalloc.stop()
+        self.peak = peak - self._baseline
+        self.retained = current - self._baseline
+        return False
+
+    def __str__(self):
+        return f"{self.label}: peak {self.peak} bytes, retained {self.retained} bytes"
+
+
+def measure(func, *args, **kwargs):
+    """Call func and measure its memory usage
+
+    :param func: Function to call with the remaining arguments
+    :return: Result of the call and its memory usage
+    :rtype: tuple(object, MemoryUsage)
+    """
+    with MemoryUsage(getattr(func, '__qualname__', '')) as usage:
+        result = func(*args, **kwargs)
+    return result, usage
@@ -0,0 +1,205 @@
+"""
+Memory budget for the PDB content of many loaded parameter sets.
+
+Most of the memory of a loaded parameter file is taken by the ``raw_pdb``
+content of its partners, which is rarely used by reports. A :class:`SpillStore`
+keeps the PDB contents of the parameter sets it tracks in memory up to a budget:
+past it, the least recently used contents are written to a temporary file and
+dropped from memory. They are read back transparently when accessed through
+the partners (``partner.raw_pdb``, ``partner['raw_pdb']``, :meth:`HADDOCKParam.dumps`...).
+Each content is written to disk once, evicting it again only drops it from memory.
+"""
+
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+
+from . import HADDOCKParam, HADDOCKParamError, Partner
+
+# Contents smaller than this (in bytes) are not worth spilling
+THRESHOLD = 4096
+
+
+class _Payload(object):
+    """
+    PDB content of a partner managed by a :class:`SpillStore`, held in the ``raw_pdb``
+    slot of the partner and called on every access. It is dropped from the store once
+    released by all the partners holding it.
+    """
+
+    __slots__ = ('store', 'text', 'size', 'offset', 'length', 'holders')
+
+    # Called on every access by Partner.raw_pdb, instead of once
+    persistent = True
+
+    def __init__(self, store, text):
+        self.store = store
+        self.text = text
+        self.size = sys.getsizeof(text)
+        self.offset = None
+        self.length = 0
+        self.holders = 1
+
+    def __call__(self):
+        return self.store._access(self)
+
+    def share(self):
+        with self.store._lock:
+            self.holders += 1
+
+    def release(self):
+        self.store._release(self)
+
+    def __reduce__(self):
+        # Copies and pickles (e.g. sent to another process) get the content itself
+        return str, (self(),)
+
+
+class SpillStore(object):
+    """
+    Store keeping the PDB contents of the tracked parameter sets within a memory budget.
+
+    The memory taken by a content is the size of its Python string. Contents set on a
+    partner after it has been tracked are not managed until it is tracked again, the
+    content they replace is dropped from the store.
+
+    :param int budget: Memory allowed for the PDB contents held in memory, in bytes
+    :param int threshold: Contents smaller than this are left untouched, in bytes
+    :param str directory: Directory of the temporary file, the default temporary directory if not given
+    """
+
+    def __init__(self, budget, threshold=THRESHOLD, directory=None):
+        if budget < 0:
+            raise HADDOCKParamError("Memory budget cannot be negative")
+        self.budget = budget
+        self.threshold = threshold
+        self.directory = directory
+        # Contents held in memory, least recently used first
+        self._resident = OrderedDict()
+        self._resident_bytes = 0
+        self._spilled_bytes = 0
+        self._spilled_count = 0
+        self._file = None
+        self._size = 0
+        self._lock = threading.RLock()
+
+    def track(self, params):
+        """Put the PDB contents of a parameter set under the memory budget
+
+        Contents not loaded yet (lazy ``raw_pdb``) are left untouched.
+
+        :param params: Loaded parameter set
+        :type params: HADDOCKParam
+        :return: Number of contents tracked
+        :rtype: int
+        :raise: HADDOCKParamError
+        """
+        if isinstance(params, HADDOCKParam):
+            params = params.partners
+        count = 0
+        with self._lock:
+            for partner in params.values():
+                if type(partner) is not Partner:
+                    continue
+                text = getattr(partner, '_raw_pdb', None)
+                if type(text) is not str or len(text) < self.threshold:
+                    continue
+                payload = _Payload(self, text)
+                partner.raw_pdb = payload
+                self._resident[payload] = None
+                self._resident_bytes += payload.size
+                count += 1
+            self._evict()
+        return count
+
+    def _access(self, payload):
+        with self._lock:
+            text = payload.text
+            if not payload.holders:
+                # Released, no longer accounted for
+                if text is None:
+                    self._file.seek(payload.offset)
+                    text = str(self._file.read(payload.length), 'utf-8')
+                return text
+            if text is None:
+                self._file.seek(payload.offset)
+                text = payload.text = str(self._file.read(payload.length), 'utf-8')
+                self._spilled_bytes -= payload.size
+                self._spilled_count -= 1
+                self._resident[payload] = None
+                self._resident_bytes += payload.size
+            else:
+                self._resident.move_to_end(payload)
+            self._evict()
+        return text
+
+    def _release(self, payload):
+        """Stop accounting for a content once no partner holds it anymore"""
+        with self._lock:
+            payload.holders -= 1
+            if payload.holders:
+                return
+            if payload.text is None:
+                self._spilled_bytes -= payload.size
+                self._spilled_count -= 1
+            else:
+                del self._resident[payload]
+                self._resident_bytes -= payload.size
+
+    def _evict(self):
+        """Spill the least recently used contents until the budget is met"""
+        while self._resident_bytes > self.budget and self._resident:
+            payload, _ = self._resident.popitem(last=False)
+            if payload.offset is None:
+                if self._file is None:
+                    self._file = tempfile.TemporaryFile(prefix='haddock_param_spill_', dir=self.directory)
+                data = payload.text.encode()
+                self._file.seek(self._size)
+                self._file.write(data)
+                payload.offset, payload.length = self._size, len(data)
+                self._size += len(data)
+            payload.text = None
+            self._resident_bytes -= payload.size
+            self._spilled_bytes += payload.size
+            self._spilled_count += 1
+
+    @property
+    def resident(self):
+        """Memory taken by the contents held in memory, in bytes"""
+        return self._resident_bytes
+
+    @property
+    def spilled(self):
+        """Memory the contents spilled to disk would take once loaded back, in bytes"""
+        return self._spilled_bytes
+
+    def usage(self):
+        """Report the memory held and spilled by the store
+
+        :return: Bytes and number of contents held in memory and spilled to disk, size of the temporary file
+        :rtype: dict
+        """
+        with self._lock:
+            return {'resident': self._resident_bytes, 'resident_count': len(self._resident),
+                    'spilled': self._spilled_bytes, 'spilled_count': self._spilled_count,
+                    'disk': self._size}
+
+    def close(self):
+        """Remove the temporary file, spilled contents cannot be accessed anymore"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def __repr__(self):
+        usage = self.usage()
+        return f"{self.__class__.__name__}(budget={self.budget}, resident={usage['resident']}, " \
+               f"spilled={usage['spilled']})"
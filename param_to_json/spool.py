@@ -0,0 +1,279 @@
+"""
+Incremental validation of the parameter files dropped in a spool directory.
+
+A :class:`SpoolWatcher` keeps track of the files already validated in a small
+JSON state file, keyed by modification time and content hash, so that only
+new or modified files are validated. Changes are detected with inotify on
+Linux and by polling the directory elsewhere.
+"""
+
+import ctypes
+import ctypes.util
+import fnmatch
+import glob
+import hashlib
+import io
+import logging
+import os
+import select
+import struct
+import sys
+import time
+
+from . import HADDOCKParam, HADDOCKParamError, HADDOCKParamFormatError, archive, json_backend
+
+# inotify(7) events signaling that a file is complete in the directory
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+# Events lost, the kernel queue being full
+IN_Q_OVERFLOW = 0x00004000
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def validate_data(data):
+    """Validate the content of a parameter file
+
+    :param bytes data: Content of the parameter file
+    :return: Validity and error message if not valid
+    :rtype: tuple(bool, str)
+    """
+    params = HADDOCKParam()
+    try:
+        params.load(io.BytesIO(data))
+        nb_partners = params.nb_partners
+        if not 2 <= nb_partners <= 20:
+            return False, f"Invalid number of partners: {nb_partners}"
+    except (HADDOCKParamError, HADDOCKParamFormatError) as e:
+        return False, str(e).strip().replace('\n', ' ')
+    except Exception as e:
+        # Whatever the content of an upload, it must not stop the watcher
+        return False, f"{e.__class__.__name__}: {e}"
+    return True, None
+
+
+class Inotify(object):
+    """
+    Minimal inotify(7) wrapper watching the files written or moved into a directory.
+
+    :param str path: Directory to watch
+    :raise: OSError if inotify is not available
+    """
+
+    def __init__(self, path):
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        try:
+            init, add_watch = libc.inotify_init1, libc.inotify_add_watch
+        except AttributeError:
+            raise OSError("inotify is not supported by the C library")
+        self.fd = init(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if add_watch(self.fd, os.fsencode(path), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed on {path}")
+        # Set by read() when events have been lost
+        self.overflow = False
+
+    def read(self, timeout=None):
+        """Wait for events and return the names of the files concerned
+
+        :attr:`overflow` is set if events have been lost (too many files arriving at once),
+        the directory should then be scanned.
+
+        :param float timeout: Maximum time to wait in seconds, wait forever if None
+        :rtype: list
+        """
+        self.overflow = False
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        buf = os.read(self.fd, 64 * 1024)
+        names = []
+        offset = 0
+        while offset < len(buf):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(buf, offset)
+            offset += _EVENT_HEADER.size
+            if mask & IN_Q_OVERFLOW:
+                self.overflow = True
+            name = buf[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class SpoolWatcher(object):
+    """
+    Validate the parameter files of a spool directory as they arrive.
+
+    :param str spool: Spool directory
+    :param str state_file: JSON file recording the files already processed
+    :param str accepted: Directory receiving a copy of the valid files
+    :param str rejected: Directory receiving a copy of the invalid files
+    :param str pattern: Shell pattern of the parameter file names
+    :param float settle: When polling, time in seconds a file must be left unmodified before being processed
+    """
+
+    def __init__(self, spool, state_file=None, accepted=None, rejected=None, pattern='*.json', settle=0.5):
+        self.spool = spool
+        self.state_file = state_file
+        self.accepted = accepted
+        self.rejected = rejected
+        self.pattern = pattern
+        self.settle = settle
+        self.state = {}
+        self._dirty = False
+        for directory in (accepted, rejected):
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        if state_file and os.path.isfile(state_file):
+            with open(state_file, 'rb') as fh:
+                self.state = json_backend.load(fh)
+
+    def save_state(self):
+        """Write the state file atomically if it changed"""
+        if not self.state_file or not self._dirty:
+            return
+        tmp = f'{self.state_file}.tmp'
+        with open(tmp, 'w') as fh:
+            fh.write(json_backend.dumps(self.state, indent=2, sort_keys=True))
+        os.replace(tmp, self.state_file)
+        self._dirty = False
+
+    def _write(self, directory, name, data):
+        tmp = os.path.join(directory, f'.{name}.tmp')
+        with open(tmp, 'wb') as fh:
+            fh.write(data)
+        os.replace(tmp, os.path.join(directory, name))
+
+    def process(self, name, now=None):
+        """Validate a file of the spool if it is new or has been modified
+
+        :param str name: File name, relative to the spool directory
+        :param float now: Current time, files modified less than ``settle`` seconds ago are skipped
+        :return: State entry of the file if it has been validated, None otherwise
+        :rtype: dict
+        """
+        if name.startswith('.') or not fnmatch.fnmatch(name, self.pattern):
+            # Hidden files include the state file and partially written copies
+            return None
+        path = os.path.join(self.spool, name)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        entry = self.state.get(name)
+        if entry and entry['mtime'] == st.st_mtime and entry['size'] == st.st_size:
+            return None
+        if now is not None and now - st.st_mtime < self.settle:
+            # Probably still being written, wait for the next scan
+            return None
+
+        with open(path, 'rb') as fh:
+            data = fh.read()
+        digest = hashlib.sha1(data).hexdigest()
+        if entry and entry['sha1'] == digest:
+            # Touched but unchanged
+            entry.update(mtime=st.st_mtime, size=st.st_size)
+            self._dirty = True
+            return None
+
+        valid, error = validate_data(data)
+        entry = {'mtime': st.st_mtime, 'size': st.st_size, 'sha1': digest, 'valid': valid, 'error': error}
+        self.state[name] = entry
+        self._dirty = True
+        directory = self.accepted if valid else self.rejected
+        if directory:
+            self._write(directory, name, data)
+        if valid:
+            sys.stdout.write(f"accepted\t{path}\n")
+        else:
+            sys.stdout.write(f"rejected\t{path}\t{error}\n")
+        sys.stdout.flush()
+        return entry
+
+    def scan(self, now=None):
+        """Process all new or modified files of the spool directory
+
+        :param float now: Current time, see :meth:`process`
+        :return: Number of files validated
+        :rtype: int
+        """
+        names = set()
+        processed = 0
+        with os.scandir(self.spool) as it:
+            for e in it:
+                if e.is_file():
+                    names.add(e.name)
+                    if self.process(e.name, now=now):
+                        processed += 1
+        # Forget files removed from the spool
+        for name in set(self.state) - names:
+            del self.state[name]
+            self._dirty = True
+        self.save_state()
+        return processed
+
+    def watch(self, poll=False, interval=1.0):
+        """Process files as they arrive in the spool, forever
+
+        :param bool poll: Force polling instead of inotify
+        :param float interval: Polling interval in seconds
+        """
+        inotify = None
+        if not poll:
+            try:
+                inotify = Inotify(self.spool)
+            except OSError as e:
+                logging.warning(f"inotify not available ({e}), polling {self.spool} every {interval}s")
+        # Catch up with the files that arrived while not watching
+        self.scan(now=time.time())
+        try:
+            while True:
+                if inotify:
+                    for name in inotify.read():
+                        self.process(name)
+                    if inotify.overflow:
+                        # Some arrivals are unknown, look at the whole directory
+                        self.scan(now=time.time())
+                    self.save_state()
+                else:
+                    time.sleep(interval)
+                    self.scan(now=time.time())
+        finally:
+            if inotify:
+                inotify.close()
+            self.save_state()
+
+
+def list_files(inputs, pattern='*.json'):
+    """Expand files, directories, glob patterns and archives into a list of parameter files
+
+    :param inputs: File paths, directories (searched for files matching pattern), glob patterns,
+        archives (members matching pattern) or archive members (``archive::member``, member patterns allowed)
+    :type inputs: list
+    :param str pattern: Shell pattern of the parameter file names within directories and archives
+    :return: Sorted list of file paths and ``archive::member`` paths, without duplicates
+    :rtype: list
+    :raise: ArchiveError
+    """
+    files = set()
+    for item in inputs:
+        if archive.SEP in item:
+            files.update(archive.expand(item, pattern))
+        elif os.path.isdir(item):
+            names = [name for name in os.listdir(item) if not name.startswith('.') and fnmatch.fnmatch(name, pattern)]
+            files.update(path for path in (os.path.join(item, name) for name in names) if os.path.isfile(path))
+        elif any(c in item for c in '*?['):
+            for path in glob.glob(item):
+                if os.path.isfile(path):
+                    files.update(archive.expand(path, pattern))
+        else:
+            files.update(archive.expand(item, pattern))
+    return sorted(files)
@@ -0,0 +1,98 @@
+"""
+Summary of many parameter files as a single table.
+
+Each parameter file gives one row, with its number of models per stage,
+the type of its partners and its clustering parameters. The files are
+summarized in parallel processes, the PDB contents of the partners (most of
+the content of the files) being skipped rather than decoded.
+"""
+
+import json
+
+from . import archive, wire
+
+# Columns of the summary and the parameters they come from, the partner types following "itw"
+FIELDS = (('it0', 'structures_0'), ('it1', 'structures_1'), ('itw', 'waterrefine'),
+          ('clust_meth', 'clust_meth'), ('clust_cutoff', 'clust_cutoff'))
+
+
+def summarize(params):
+    """Summary of a parameter set
+
+    :param dict params: Parameters, with or without the PDB contents of the partners
+    :return: Summary fields by name, ``partners`` being the list of the molecule types of the partners
+    :rtype: dict
+    :raise: KeyError, TypeError on parameters missing or of the wrong format
+    """
+    row = {name: params[key] for name, key in FIELDS}
+    partners = params['partners']
+    row['partners'] = [partners[i]['moleculetype'] for i in sorted(partners, key=int)]
+    return row
+
+
+def _summarize_data(path, data, error):
+    if error is not None:
+        return None, error
+    try:
+        return summarize(wire.loads(data, raw_pdb=False)), None
+    except (ValueError, KeyError, TypeError) as e:
+        return None, f"{e.__class__.__name__}: {e}"
+
+
+def summarize_files(paths, workers=None):
+    """Summarize parameter files and archive members, in parallel processes
+
+    :param list paths: File paths or ``archive::member`` paths, see :func:`param_to_json.spool.list_files`
+    :param int workers: Number of processes, one per CPU if not given, no parallelism if 1
+    :return: Pairs of path and summary (see :func:`summarize`) in the order of paths, and pairs of path
+        and error message for the files that could not be summarized
+    :rtype: tuple(list, list)
+    """
+    rows, errors = [], []
+    for path, (row, error) in zip(paths, archive.map_files(_summarize_data, paths, workers=workers)):
+        if row is None:
+            errors.append((path, error))
+        else:
+            rows.append((path, row))
+    return rows, errors
+
+
+def table(rows):
+    """Flatten summaries into a table, with one column per partner
+
+    :param list rows: Pairs of path and summary, as returned by :func:`summarize_files`
+    :return: Column names and rows of values, missing partners being None
+    :rtype: tuple(list, list)
+    """
+    nb_partners = max((len(row['partners']) for _, row in rows), default=0)
+    partners = [f'partner{i}' for i in range(1, nb_partners + 1)]
+    columns = ['file', 'it0', 'it1', 'itw', *partners, 'clust_meth', 'clust_cutoff']
+    values = []
+    for path, row in rows:
+        missing = [None] * (nb_partners - len(row['partners']))
+        values.append([path, row['it0'], row['it1'], row['itw'], *row['partners'], *missing,
+                       row['clust_meth'], row['clust_cutoff']])
+    return columns, values
+
+
+def write_tsv(rows, fh):
+    """Write summaries as tab-separated values, with a header line
+
+    :param list rows: Pairs of path and summary, as returned by :func:`summarize_files`
+    :param fh: Output text file-object
+    """
+    columns, values = table(rows)
+    fh.write('\t'.join(columns) + '\n')
+    for row in values:
+        fh.write('\t'.join('' if v is None else str(v) for v in row) + '\n')
+
+
+def write_json(rows, fh):
+    """Write summaries as a JSON list of objects, one per file
+
+    :param list rows: Pairs of path and summary, as returned by :func:`summarize_files`
+    :param fh: Output text file-object
+    """
+    columns, values = table(rows)
+    json.dump([dict(zip(columns, row)) for row in values], fh, indent=2)
+    fh.write('\n')
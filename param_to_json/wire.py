@@ -0,0 +1,213 @@
+"""
+Compact binary format exchanged by the scripts through pipes.
+
+Formatting the PDB content of the partners as indented JSON, and parsing it
+back, takes most of the time of each script of a pipeline. With
+``HADDOCK_PARAM_WIRE=binary`` in the environment, scripts whose standard output
+is a pipe write the parameters in a binary format read back by the next script
+instead:
+
+- the magic header :data:`MAGIC`
+- the length of the header, as an unsigned 64-bit little-endian integer
+- the header: compact JSON (UTF-8) of the parameters without the ``raw_pdb``
+  of the partners, and the partner numbers and lengths of the PDB contents
+- the PDB contents (UTF-8), one after the other
+
+The readers detect the format from the magic header, so JSON files keep
+working everywhere. The last script of a pipeline (writing to a terminal or a
+file) writes JSON, identical to the one written without this format. The format
+is opt-in since the reader of a pipe may be any other tool (``jq``, ``gzip``...):
+without ``HADDOCK_PARAM_WIRE`` (or with ``json``), JSON is always written.
+"""
+
+import io
+import json
+import os
+import stat
+import struct
+
+from . import json_backend
+
+MAGIC = b'\x93HPWIRE\x01'
+ENV_VAR = 'HADDOCK_PARAM_WIRE'
+_LENGTH = struct.Struct('<Q')
+
+
+class WireFormatError(ValueError):
+    """Raised when binary parameters are truncated or corrupted"""
+
+
+def is_wire(data):
+    """Check whether data starts with the magic header of the binary format
+
+    :param bytes data: Beginning of the content
+    :rtype: bool
+    """
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:len(MAGIC)]) == MAGIC
+
+
+def encode_header(params, sizes):
+    """Encode the beginning of binary parameters, up to the PDB contents
+
+    :param dict params: Parameters, the ``raw_pdb`` of the partners being ignored
+    :param list sizes: Pairs of partner number and length in bytes of its PDB content, in the order
+        the contents follow the header
+    :rtype: bytes
+    """
+    partners = {}
+    for i, partner in params['partners'].items():
+        partners[i] = {k: partner[k] for k in partner if k != 'raw_pdb'}
+    # Small part of the data, the json module keeps non-finite numbers and big integers untouched
+    header = json.dumps({'params': dict(params, partners=partners), 'raw_pdb': sizes},
+                        separators=(',', ':'), ensure_ascii=False).encode()
+    return MAGIC + _LENGTH.pack(len(header)) + header
+
+
+def write(params, fh):
+    """Write parameters in binary format
+
+    :param dict params: Parameters
+    :param fh: Binary file-object
+    """
+    pdbs = [(i, partner['raw_pdb'].encode()) for i, partner in params['partners'].items()
+            if 'raw_pdb' in partner]
+    fh.write(encode_header(params, [(i, len(pdb)) for i, pdb in pdbs]))
+    for _, pdb in pdbs:
+        fh.write(pdb)
+
+
+def dumps(params):
+    """Encode parameters in binary format
+
+    :param dict params: Parameters
+    :rtype: bytes
+    """
+    out = io.BytesIO()
+    write(params, out)
+    return out.getvalue()
+
+
+def _string_end(data, pos):
+    """Position of the quote ending the JSON string starting at pos"""
+    end = data.find(b'"', pos + 1)
+    while end >= 0:
+        # Quotes escaped by an odd number of backslashes are part of the string
+        backslashes = 0
+        while data[end - backslashes - 1] == 0x5c:
+            backslashes += 1
+        if not backslashes % 2:
+            return end
+        end = data.find(b'"', end + 1)
+    return end
+
+
+def _skip_raw_pdb(data):
+    """Replace the PDB contents of JSON parameters by null, without decoding them"""
+    if isinstance(data, str):
+        data = data.encode()
+    pieces = []
+    start = pos = 0
+    while True:
+        pos = data.find(b'"raw_pdb"', pos)
+        if pos < 0:
+            break
+        pos += len(b'"raw_pdb"')
+        while data[pos:pos + 1] in (b' ', b'\t', b'\n', b'\r', b':'):
+            pos += 1
+        if data[pos:pos + 1] != b'"':
+            continue
+        end = _string_end(data, pos)
+        if end < 0:
+            break
+        pieces += [data[start:pos], b'null']
+        start = pos = end + 1
+    if not pieces:
+        return data
+    pieces.append(data[start:])
+    return b''.join(pieces)
+
+
+def loads(data, raw_pdb=True):
+    """Decode parameters in binary format or JSON
+
+    :param data: Content, binary format detected from the magic header
+    :type data: bytes, str
+    :param bool raw_pdb: Decode the PDB contents of the partners, which are left out otherwise (much faster)
+    :rtype: dict
+    :raise: WireFormatError, JSONDecodeError
+    """
+    if not is_wire(data):
+        if raw_pdb:
+            return json_backend.loads(data)
+        params = json_backend.loads(_skip_raw_pdb(data))
+        partners = params.get('partners') if isinstance(params, dict) else None
+        if isinstance(partners, dict):
+            for partner in partners.values():
+                if isinstance(partner, dict) and partner.get('raw_pdb', 0) is None:
+                    del partner['raw_pdb']
+        return params
+    data = memoryview(data)
+    start = len(MAGIC) + _LENGTH.size
+    if len(data) < start:
+        raise WireFormatError("Truncated binary parameters")
+    end = start + _LENGTH.unpack_from(data, len(MAGIC))[0]
+    try:
+        header = bytes(data[start:end])
+        try:
+            header = json_backend.loads(header)
+        except ValueError:
+            # Non-finite numbers or big integers, only written by the json module
+            header = json.loads(header)
+        params = header['params']
+        for i, size in header['raw_pdb'] if raw_pdb else ():
+            if end + size > len(data):
+                raise WireFormatError("Truncated binary parameters")
+            params['partners'][i]['raw_pdb'] = str(data[end:end + size], 'utf-8')
+            end += size
+    except WireFormatError:
+        raise
+    except (ValueError, KeyError, TypeError) as e:
+        raise WireFormatError(f"Corrupted binary parameters: {e}") from None
+    return params
+
+
+def load(fh, raw_pdb=True):
+    """Decode parameters in binary format or JSON from a file-object
+
+    :param fh: Binary (or text, for JSON only) file-object
+    :param bool raw_pdb: Decode the PDB contents of the partners, see :func:`loads`
+    :rtype: dict
+    :raise: WireFormatError, JSONDecodeError
+    """
+    return loads(fh.read(), raw_pdb=raw_pdb)
+
+
+def use_binary(fh):
+    """Choose the output format: binary if enabled by ``HADDOCK_PARAM_WIRE=binary`` and fh is a pipe
+
+    :param fh: Output file-object
+    :rtype: bool
+    """
+    if os.environ.get(ENV_VAR, 'json').strip().lower() != 'binary':
+        return False
+    try:
+        return stat.S_ISFIFO(os.fstat(fh.fileno()).st_mode)
+    except (AttributeError, OSError, ValueError):
+        # e.g. io.StringIO
+        return False
+
+
+def dump(params, fh):
+    """Write a parameter set in binary format if enabled and fh is a pipe, as JSON otherwise
+
+    :param HADDOCKParam params: Parameters
+    :param fh: Output text file-object (e.g. ``sys.stdout``)
+    """
+    if use_binary(fh):
+        fh.flush()
+        write(params.snapshot(), fh.buffer)
+        fh.buffer.flush()
+    else:
+        fh.write(params.dumps())
+        fh.write("\n")
+        fh.flush()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+
+"""
+Build a parameter file (JSON) from a template parameter file and PDB files.
+
+The n-th PDB file becomes the n-th partner, its parameters being taken from the
+n-th partner of the template (or the last one, with a new segid). The content of
+the PDB files is streamed into the output, so that large complexes can be built
+with little memory. The output is written on stdout unless -o is given.
+
+usage:
+    | $> python haddock_param_build.py [-o <output.json>] <template.json> <pdb file> [<pdb file> ...]
+example:
+    | $> python haddock_param_build.py job_params.json receptor.pdb ligand.pdb > new_params.json
+
+This script is supposed to work with the new parameter files
+used in HADDOCK2.4 (JSON format).
+"""
+
+import os
+import sys
+import argparse
+
+try:
+    from param_to_json import HADDOCKParam, HADDOCKParamError, HADDOCKParamFormatError
+except ImportError:
+    # Running from the source tree
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from param_to_json import HADDOCKParam, HADDOCKParamError, HADDOCKParamFormatError
+
+from param_to_json import wire
+from param_to_json.build import build
+
+__author__ = "Mikael Trellet"
+__email__ = "mikael.trellet@gmail.com"
+
+USAGE = __doc__
+
+
+def check_input(args):
+    """
+    Checks whether to read from stdin/file and validates user input/options.
+    :param: args: command-line arguments
+    :return: options: parsed options
+    """
+    parser = argparse.ArgumentParser(add_help=False, usage=argparse.SUPPRESS)
+    parser.add_argument('template', nargs='?')
+    parser.add_argument('pdbs', nargs='*')
+    parser.add_argument('-o', '--output')
+    parser.add_argument('-h', '--help', action='store_true')
+    options, unknown = parser.parse_known_args(args)
+
+    if options.help or unknown or not options.pdbs:
+        sys.stderr.write(USAGE)
+        sys.exit(1)
+    for path in [options.template] + options.pdbs:
+        if not os.path.isfile(path):
+            sys.stderr.write('File not found: ' + path + '\n')
+            sys.exit(1)
+    return options
+
+
+if __name__ == '__main__':
+    # Check Input
+    options = check_input(sys.argv[1:])
+
+    try:
+        # Do the job
+        template = HADDOCKParam()
+        template.load(options.template)
+        if options.output:
+            build(template, options.pdbs, options.output)
+        elif wire.use_binary(sys.stdout):
+            # Binary parameters for the next script of the pipeline
+            build(template, options.pdbs, sys.stdout.buffer, binary=True)
+        else:
+            build(template, options.pdbs, sys.stdout)
+        sys.stdout.flush()
+    except IOError:
+        # This is here to catch Broken Pipes
+        # for example to use 'head' or 'tail' without
+        # the error message showing up
+        pass
+    except (HADDOCKParamError, HADDOCKParamFormatError) as e:
+        sys.stderr.write(f"ERROR: {e}\n")
+        sys.exit(1)
+
+    sys.exit(0)
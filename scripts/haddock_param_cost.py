@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+
+"""
+Estimate the computing cost (CPU-hours) of HADDOCK runs from their parameter files (JSON).
+
+Many files, directories, glob patterns or archives (tar, zip, or archive.tar.gz::member)
+can be given, the runs are then ranked from the most to the least expensive. The cost model
+coefficients can be fitted on previous runs with --fit, from a tab-separated file listing
+parameter files and the CPU-hours they consumed.
+
+usage:
+    | $> python haddock_param_cost.py [options] <json file/directory/pattern/archive> ...
+    | $> python haddock_param_cost.py --fit <runs.tsv> [-o <coefficients.json>]
+options:
+    | -c/--coefficients <file>    Cost model coefficients (JSON), written by --fit
+    | -j/--jobs <n>               Number of processes used to read the files (default: one per CPU)
+    | --max-hours <hours>         Flag the runs expected to consume more CPU-hours
+example:
+    | $> python haddock_param_cost.py --max-hours 5 spool/
+    | file                     cpu_hours    cpus    wall_hours    status
+    | spool/job_1235.json      7.85         50      0.16          throttle
+    | spool/job_1234.json      2.10         50      0.04          ok
+
+This script is supposed to work with the new parameter files
+used in HADDOCK2.4 (JSON format).
+"""
+
+import os
+import sys
+import argparse
+
+try:
+    from param_to_json import HADDOCKParamError, json_backend
+except ImportError:
+    # Running from the source tree
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from param_to_json import HADDOCKParamError, json_backend
+
+from param_to_json import wire
+from param_to_json.archive import read_file
+from param_to_json.cost import CostModel, estimate_files
+from param_to_json.spool import list_files
+
+__author__ = "Mikael Trellet"
+__email__ = "mikael.trellet@gmail.com"
+
+USAGE = __doc__
+
+
+def check_input(args):
+    """
+    Checks whether to read from stdin/file and validates user input/options.
+    :param: args: command-line arguments
+    :return: options: parsed options
+    """
+    parser = argparse.ArgumentParser(add_help=False, usage=argparse.SUPPRESS)
+    parser.add_argument('inputs', nargs='*')
+    parser.add_argument('-c', '--coefficients')
+    parser.add_argument('-j', '--jobs', type=int)
+    parser.add_argument('--max-hours', type=float)
+    parser.add_argument('--fit')
+    parser.add_argument('-o', '--output')
+    parser.add_argument('-h', '--help', action='store_true')
+    options, unknown = parser.parse_known_args(args)
+
+    if options.help or unknown:
+        sys.stderr.write(USAGE)
+        sys.exit(1)
+    for path in filter(None, (options.coefficients, options.fit)):
+        if not os.path.isfile(path):
+            sys.stderr.write('File not found: ' + path + '\n')
+            sys.exit(1)
+    if options.fit:
+        return options
+    if not options.inputs and sys.stdin.isatty():
+        sys.stderr.write(USAGE)
+        sys.exit(1)
+    return options
+
+
+def fit(runs_file, output=None):
+    """
+    Fit the cost model on previous runs
+    :param str runs_file: tab-separated file of parameter files and CPU-hours consumed
+    :param str output: file receiving the coefficients (JSON)
+    """
+    runs = []
+    with open(runs_file) as fh:
+        for line in fh:
+            if not line.strip() or line.startswith('#'):
+                continue
+            path, cpu_hours = line.rstrip('\n').split('\t')[:2]
+            runs.append((json_backend.loads(read_file(path)), float(cpu_hours)))
+    model = CostModel.fit(runs)
+    if output:
+        model.save(output)
+    for name, value in sorted(model.coefficients.items()):
+        sys.stdout.write(f"{name}\t{value:.6g}\n")
+
+
+def print_costs(results, max_hours=None):
+    """
+    Print the estimated costs, most expensive first
+    :param list results: triplets of path, estimate and error message
+    :param float max_hours: CPU-hours above which a run is flagged
+    """
+    sys.stdout.write("file\tcpu_hours\tcpus\twall_hours\tstatus\n")
+    ranked = sorted(results, key=lambda r: -r[1].cpu_hours if r[1] else 0.0)
+    for path, estimate, error in ranked:
+        if estimate is None:
+            sys.stdout.write(f"{path}\t\t\t\terror: {error}\n")
+            continue
+        status = 'throttle' if max_hours is not None and estimate.cpu_hours > max_hours else 'ok'
+        sys.stdout.write(f"{path}\t{estimate.cpu_hours:.2f}\t{estimate.cpus}\t{estimate.wall_hours:.2f}\t{status}\n")
+    sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    # Check Input
+    options = check_input(sys.argv[1:])
+
+    try:
+        # Do the job
+        if options.fit:
+            fit(options.fit, options.output)
+        else:
+            model = CostModel.load(options.coefficients) if options.coefficients else CostModel()
+            if options.inputs:
+                results = estimate_files(list_files(options.inputs), model, workers=options.jobs)
+            else:
+                results = [('-', model.estimate(wire.load(sys.stdin.buffer)), None)]
+            print_costs(results, options.max_hours)
+    except IOError:
+        # This is here to catch Broken Pipes
+        # for example to use 'head' or 'tail' without
+        # the error message showing up
+        pass
+    except (HADDOCKParamError, ValueError) as e:
+        sys.stderr.write(f"ERROR: {e}\n")
+        sys.exit(1)
+
+    sys.exit(0)
@@ -5,7 +5,7 @@ Extract the PDB input files from a job parameter file (JSON)
 in the current directory
 
 usage:
-    | $> python haddock_param_summary.py <json file>
+    | $> python haddock_param_summary.py <json file or archive.tar.gz::member>
 example:
     | $> python haddock_param_summary.py job_params.json
     | partner1.pdb created
@@ -16,9 +16,18 @@ used in HADDOCK2.4 (JSON format).
 """
 
 import os
-import json
 import sys
 
+try:
+    # JSON (with the fastest JSON library available) or binary parameters from a pipe
+    from param_to_json import wire
+except ImportError:
+    # Running from the source tree
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from param_to_json import wire
+
+from param_to_json.archive import isfile, open_file
+
 __author__ = "Mikael Trellet"
 __email__ = "mikael.trellet@gmail.com"
 
@@ -35,17 +44,17 @@ def check_input(args):
     if not len(args):
         # No chain, from pipe
         if not sys.stdin.isatty():
-            jsonfh = sys.stdin
+            jsonfh = sys.stdin.buffer
         else:
             sys.stderr.write(USAGE)
             sys.exit(1)
     elif len(args) == 1:
-        if not os.path.isfile(args[0]):
+        if not isfile(args[0]):
             if args[0] not in ("-h", "--help"):
                 sys.stderr.write('File not found: ' + args[0] + '\n')
             sys.stderr.write(USAGE)
             sys.exit(1)
-        jsonfh = open(args[0], 'rU')
+        jsonfh = open_file(args[0])
     else:
         sys.stderr.write(USAGE)
         sys.exit(1)
@@ -59,7 +68,7 @@ def extract_pdbs(jsonfh):
     :param: jsonfh: json paramter file as file-object
     """
     try:
-        params = json.load(jsonfh)
+        params = wire.load(jsonfh)
         for p, pdb in params['partners'].items():
             with open(f'partner{p}.pdb', 'w') as o:
                 o.write(pdb['raw_pdb'])
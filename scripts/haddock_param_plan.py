@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+
+"""
+Plan the CPUs of a batch of HADDOCK runs sharing a cluster from their parameter files (JSON).
+
+The work of each run is estimated from its number of models, steps and atoms, and the
+cores available are shared proportionally to it so that all the runs end at the same time.
+The cpunumber of the queues of each run is rewritten accordingly. The cores available
+are given as a number or as a JSON file describing the cluster, e.g. {"cores": 512, "max_per_run": 100}.
+
+usage:
+    | $> python haddock_param_plan.py -c <cores or cluster file> [options] <json file/directory/pattern/archive> ...
+options:
+    | -c/--cores <n or file>      Cores available for the batch, or cluster description (JSON)
+    | -m/--max-per-run <n>        Maximum number of CPUs of a run
+    | -C/--coefficients <file>    Cost model coefficients (JSON), see haddock_param_cost.py
+    | -o/--output <dir>           Directory receiving the updated parameter files (report only if not given)
+example:
+    | $> python haddock_param_plan.py -c 128 -o planned/ spool/
+    | file                   cpu_hours    cpus_before    cpus_after    wall_hours
+    | spool/job_1234.json    7.85         50             29            0.27
+    | spool/job_1235.json    5.16         50             19            0.27
+    | spool/job_1236.json    21.30        50             80            0.27
+    | # makespan before: 0.43 h, after: 0.27 h
+
+This script is supposed to work with the new parameter files
+used in HADDOCK2.4 (JSON format).
+"""
+
+import io
+import os
+import sys
+import argparse
+
+try:
+    from param_to_json import HADDOCKParam, HADDOCKParamError, HADDOCKParamFormatError, json_backend
+except ImportError:
+    # Running from the source tree
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from param_to_json import HADDOCKParam, HADDOCKParamError, HADDOCKParamFormatError, json_backend
+
+from param_to_json.archive import iter_files, split_path
+from param_to_json.cost import CostModel
+from param_to_json.plan import plan_runs
+from param_to_json.spool import list_files
+
+__author__ = "Mikael Trellet"
+__email__ = "mikael.trellet@gmail.com"
+
+USAGE = __doc__
+
+
+def check_input(args):
+    """
+    Validates user input/options.
+    :param: args: command-line arguments
+    :return: options: parsed options
+    """
+    parser = argparse.ArgumentParser(add_help=False, usage=argparse.SUPPRESS)
+    parser.add_argument('inputs', nargs='*')
+    parser.add_argument('-c', '--cores')
+    parser.add_argument('-m', '--max-per-run', type=int)
+    parser.add_argument('-C', '--coefficients')
+    parser.add_argument('-o', '--output')
+    parser.add_argument('-h', '--help', action='store_true')
+    options, unknown = parser.parse_known_args(args)
+
+    if options.help or unknown or not options.inputs or not options.cores:
+        sys.stderr.write(USAGE)
+        sys.exit(1)
+    if options.cores.isdigit():
+        options.cores = int(options.cores)
+    elif os.path.isfile(options.cores):
+        with open(options.cores, 'rb') as fh:
+            cluster = json_backend.load(fh)
+        options.cores = cluster['cores']
+        if options.max_per_run is None:
+            options.max_per_run = cluster.get('max_per_run')
+    else:
+        sys.stderr.write('Wrong number of cores or file not found: ' + options.cores + '\n')
+        sys.exit(1)
+    if options.cores < 1:
+        sys.stderr.write('At least one core is needed\n')
+        sys.exit(1)
+    return options
+
+
+def load_runs(paths):
+    """
+    Load the parameter files of the batch
+    :param list paths: parameter files
+    :return: runs: loaded parameter files, as pairs of path and HADDOCKParam
+    """
+    runs = []
+    # Compressed archives are read once, in archive order
+    for path, data, error in iter_files(paths):
+        params = HADDOCKParam()
+        try:
+            if error:
+                raise HADDOCKParamError(error)
+            params.load(io.BytesIO(data))
+            runs.append((path, params))
+        except (HADDOCKParamError, HADDOCKParamFormatError) as e:
+            error = str(e).strip().replace('\n', ' ')
+            sys.stderr.write(f"ERROR: {path} skipped: {error}\n")
+    order = {path: i for i, path in enumerate(paths)}
+    return sorted(runs, key=lambda run: order[run[0]])
+
+
+def output_names(paths):
+    """
+    Names of the updated parameter files of the runs, relative to the output directory. Archive
+    members keep their path in the archive, other files their path relative to the common
+    directory of the files
+    :param list paths: parameter files or archive members
+    :return: names: relative paths of the updated files, in the order of paths
+    :raise: HADDOCKParamError if two runs would be written to the same file
+    """
+    files = [os.path.abspath(path) for path in paths if not split_path(path)[1]]
+    root = os.path.commonpath([os.path.dirname(path) for path in files]) if files else ''
+    names = []
+    for path in paths:
+        member = split_path(path)[1]
+        if member:
+            member = os.path.normpath(member)
+            if os.path.isabs(member) or member.startswith('..'):
+                member = os.path.basename(member)
+            names.append(member)
+        else:
+            names.append(os.path.relpath(os.path.abspath(path), root))
+    seen = {}
+    for path, name in zip(paths, names):
+        if name in seen:
+            raise HADDOCKParamError(f"{seen[name]} and {path} would both be written to {name}")
+        seen[name] = path
+    return names
+
+
+def plan(runs, cores, model, max_per_run=None, output=None):
+    """
+    Plan the CPUs of the runs, write the updated files and the plan report
+    :param list runs: pairs of path and HADDOCKParam
+    :param int cores: cores available for the batch
+    :param CostModel model: cost model
+    :param int max_per_run: maximum number of CPUs of a run
+    :param str output: directory receiving the updated parameter files
+    """
+    plans, before, after = plan_runs([params for _, params in runs], cores, model, max_per_run)
+    if output:
+        names = output_names([path for path, _ in runs])
+        os.makedirs(output, exist_ok=True)
+        for (path, params), name in zip(runs, names):
+            name = os.path.join(output, name)
+            os.makedirs(os.path.dirname(name), exist_ok=True)
+            params.dump(name)
+
+    sys.stdout.write("file\tcpu_hours\tcpus_before\tcpus_after\twall_hours\n")
+    for (path, _), p in zip(runs, plans):
+        sys.stdout.write(f"{path}\t{p.cpu_hours:.2f}\t{p.cpus_before}\t{p.cpus_after}\t{p.wall_hours:.2f}\n")
+    sys.stdout.write(f"# makespan before: {before:.2f} h, after: {after:.2f} h\n")
+    sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    # Check Input
+    options = check_input(sys.argv[1:])
+
+    try:
+        # Do the job
+        model = CostModel.load(options.coefficients) if options.coefficients else CostModel()
+        runs = load_runs(list_files(options.inputs))
+        plan(runs, options.cores, model, options.max_per_run, options.output)
+    except IOError:
+        # This is here to catch Broken Pipes
+        # for example to use 'head' or 'tail' without
+        # the error message showing up
+        pass
+    except (HADDOCKParamError, HADDOCKParamFormatError, ValueError) as e:
+        sys.stderr.write(f"ERROR: {e}\n")
+        sys.exit(1)
+
+    sys.exit(0)
@@ -3,8 +3,16 @@
 """
 Get a quick summary of the job parameter file (JSON)
 
+Given several files, directories, glob patterns, a whole archive or member pattern
+(or -f), a single table is written instead, with one row per parameter file and one column per summary field.
+The files are summarized in parallel, the PDB contents being skipped.
+
 usage:
-    | $> python haddock_param_summary.py <json file>
+    | $> python haddock_param_summary.py <json file or archive.tar.gz::member>
+    | $> python haddock_param_summary.py [options] <json file/directory/pattern/archive> ...
+options:
+    | -f/--format <tsv|json>      Format of the table (default: tsv)
+    | -j/--workers <n>            Number of processes (default: one per CPU)
 example:
     | $> python haddock_param_summary.py job_params.json
     | it0 1000
@@ -14,14 +22,30 @@ example:
     | Partner2: Protein
     | clust_meth: FCC
     | clust_cutoff: 0.6
+    | $> python haddock_param_summary.py runs/ archive.tar.gz
+    | file                              it0     it1    itw    partner1    partner2    clust_meth    clust_cutoff
+    | runs/job_1234.json                1000    200    200    Protein     Protein     FCC           0.6
+    | archive.tar.gz::run1/job.json     10000   400    400    Protein     DNA         RMSD          7.5
 
 This script is supposed to work with the new parameter files
 used in HADDOCK2.4 (JSON format).
 """
 
 import os
-import json
 import sys
+import argparse
+
+try:
+    # JSON (with the fastest JSON library available) or binary parameters from a pipe
+    from param_to_json import wire
+except ImportError:
+    # Running from the source tree
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from param_to_json import wire
+
+from param_to_json.archive import ArchiveError, is_archive, isfile, open_file, split_path
+from param_to_json.spool import list_files
+from param_to_json.summary import summarize_files, write_json, write_tsv
 
 __author__ = "Mikael Trellet"
 __email__ = "mikael.trellet@gmail.com"
@@ -29,37 +53,51 @@ __email__ = "mikael.trellet@gmail.com"
 USAGE = __doc__.format(__author__, __email__)
 
 
+def is_single(path):
+    """
+    Checks whether a path is a single parameter file, rather than a whole archive or member pattern.
+    :param: path: file path or archive::member
+    :return: bool
+    """
+    member = split_path(path)[1]
+    if member is None:
+        return not is_archive(path) and isfile(path)
+    return not any(c in member for c in '*?[') and isfile(path)
+
+
 def check_input(args):
     """
     Checks whether to read from stdin/file and validates user input/options.
     :param: args: command-line arguments
-    :return: jsonfh: json paramter file as file-object
+    :return: options: parsed options, with jsonfh, json paramter file as file-object for a single
+             summary, or None for a table
     """
-
-    if not len(args):
+    parser = argparse.ArgumentParser(add_help=False, usage=argparse.SUPPRESS)
+    parser.add_argument('inputs', nargs='*')
+    parser.add_argument('-f', '--format', choices=('tsv', 'json'))
+    parser.add_argument('-j', '--workers', type=int)
+    parser.add_argument('-h', '--help', action='store_true')
+    options, unknown = parser.parse_known_args(args)
+    options.jsonfh = None
+
+    if options.help or unknown:
+        sys.stderr.write(USAGE)
+        sys.exit(1)
+    if not options.inputs:
         # No chain, from pipe
-        if not sys.stdin.isatty():
-            jsonfh = sys.stdin
+        if not sys.stdin.isatty() and not options.format:
+            options.jsonfh = sys.stdin.buffer
         else:
             sys.stderr.write(USAGE)
             sys.exit(1)
-    elif len(args) == 1:
-        if not os.path.isfile(args[0]):
-            if args[0] not in ("-h", "--help"):
-                sys.stderr.write('File not found: ' + args[0] + '\n')
-            sys.stderr.write(USAGE)
-            sys.exit(1)
-        jsonfh = open(args[0], 'rU')
-    else:
-        sys.stderr.write(USAGE)
-        sys.exit(1)
-
-    return jsonfh
+    elif len(options.inputs) == 1 and not options.format and is_single(options.inputs[0]):
+        options.jsonfh = open_file(options.inputs[0])
+    return options
 
 
 def print_summary(jsonfh):
     try:
-        params = json.load(jsonfh)
+        params = wire.load(jsonfh, raw_pdb=False)
         # Number of models
         sys.stdout.write(f"it0\t{params['structures_0']}\nit1\t{params['structures_1']}\nitw\t{params['waterrefine']}\n")
         # Number of partners + type
@@ -74,9 +112,39 @@ def print_summary(jsonfh):
         raise
 
 
+def print_table(inputs, output_format='tsv', workers=None):
+    """
+    Summarize parameter files as a table
+    :param list inputs: files, directories, glob patterns or archives
+    :param str output_format: tsv or json
+    :param int workers: number of processes
+    :return: number of files that could not be summarized
+    """
+    rows, errors = summarize_files(list_files(inputs), workers=workers)
+    for path, error in errors:
+        sys.stderr.write(f"ERROR: {path} skipped: {error}\n")
+    if output_format == 'json':
+        write_json(rows, sys.stdout)
+    else:
+        write_tsv(rows, sys.stdout)
+    sys.stdout.flush()
+    return len(errors)
+
+
 if __name__ == '__main__':
     # Check Input
-    jsonfh = check_input(sys.argv[1:])
+    options = check_input(sys.argv[1:])
+    jsonfh = options.jsonfh
+
+    if jsonfh is None:
+        try:
+            if not print_table(options.inputs, options.format, options.workers):
+                sys.exit(0)
+        except ArchiveError as e:
+            sys.stderr.write(f"ERROR: {e}\n")
+        except IOError:
+            sys.exit(0)
+        sys.exit(1)
 
     try:
         # Do the job
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+
+"""
+Watch a spool directory and validate the HADDOCK parameter files (JSON) as they arrive.
+
+Only new or modified files are validated, the files already processed are recorded
+in a state file keyed by modification time and content hash. Valid and invalid files
+can be copied to separate directories. inotify is used on Linux, the directory is
+polled otherwise.
+
+usage:
+    | $> python haddock_param_watch.py [options] <spool directory>
+options:
+    | -s/--state <file>       State file (default: <spool directory>/.hp_watch_state.json)
+    | -a/--accepted <dir>     Directory receiving the valid parameter files
+    | -r/--rejected <dir>     Directory receiving the invalid parameter files
+    | -p/--pattern <glob>     Pattern of the parameter file names (default: *.json)
+    | --poll                  Poll the directory instead of using inotify
+    | --interval <seconds>    Polling interval (default: 1.0)
+    | --once                  Validate the new files and exit
+example:
+    | $> python haddock_param_watch.py -a accepted/ -r rejected/ spool/
+    | accepted    spool/job_params_1234.json
+    | rejected    spool/job_params_1235.json    Key missing. Parameter: "amb_cool1"
+
+This script is supposed to work with the new parameter files
+used in HADDOCK2.4 (JSON format).
+"""
+
+import os
+import sys
+import argparse
+
+try:
+    from param_to_json.spool import SpoolWatcher
+except ImportError:
+    # Running from the source tree
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from param_to_json.spool import SpoolWatcher
+
+__author__ = "Mikael Trellet"
+__email__ = "mikael.trellet@gmail.com"
+
+USAGE = __doc__
+
+
+def check_input(args):
+    """
+    Validates user input/options.
+    :param: args: command-line arguments
+    :return: options: parsed options
+    """
+    parser = argparse.ArgumentParser(add_help=False, usage=argparse.SUPPRESS)
+    parser.add_argument('spool', nargs='?')
+    parser.add_argument('-s', '--state')
+    parser.add_argument('-a', '--accepted')
+    parser.add_argument('-r', '--rejected')
+    parser.add_argument('-p', '--pattern', default='*.json')
+    parser.add_argument('--poll', action='store_true')
+    parser.add_argument('--interval', type=float, default=1.0)
+    parser.add_argument('--once', action='store_true')
+    parser.add_argument('-h', '--help', action='store_true')
+    options, unknown = parser.parse_known_args(args)
+
+    if options.help or unknown or not options.spool:
+        sys.stderr.write(USAGE)
+        sys.exit(1)
+    if not os.path.isdir(options.spool):
+        sys.stderr.write('Directory not found: ' + options.spool + '\n')
+        sys.stderr.write(USAGE)
+        sys.exit(1)
+    if not options.state:
+        options.state = os.path.join(options.spool, '.hp_watch_state.json')
+    return options
+
+
+if __name__ == '__main__':
+    # Check Input
+    options = check_input(sys.argv[1:])
+
+    watcher = SpoolWatcher(options.spool, state_file=options.state, accepted=options.accepted,
+                           rejected=options.rejected, pattern=options.pattern)
+    try:
+        # Do the job
+        if options.once:
+            watcher.scan()
+        else:
+            watcher.watch(poll=options.poll, interval=options.interval)
+    except KeyboardInterrupt:
+        pass
+    except IOError:
+        # This is here to catch Broken Pipes
+        # for example to use 'head' or 'tail' without
+        # the error message showing up
+        pass
+
+    sys.exit(0)
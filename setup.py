@@ -8,6 +8,10 @@ shutil.copyfile('scripts/haddock_param_extract_pdb.py', 'build/_scripts/hp_extra
 shutil.copyfile('scripts/haddock_param_summary.py', 'build/_scripts/hp_summary')
 shutil.copyfile('scripts/haddock_param_replace.py', 'build/_scripts/hp_replace')
 shutil.copyfile('scripts/haddock_param_validate.py', 'build/_scripts/hp_validate')
+shutil.copyfile('scripts/haddock_param_watch.py', 'build/_scripts/hp_watch')
+shutil.copyfile('scripts/haddock_param_cost.py', 'build/_scripts/hp_cost')
+shutil.copyfile('scripts/haddock_param_plan.py', 'build/_scripts/hp_plan')
+shutil.copyfile('scripts/haddock_param_build.py', 'build/_scripts/hp_build')
 
 with open("README.md", "r") as fh:
     long_description = fh.read()
@@ -24,7 +28,8 @@ setuptools.setup(
     packages=setuptools.find_packages(),
     test_suite='nose.collector',
     scripts=['build/_scripts/hp_extract_pdb', 'build/_scripts/hp_summary', 'build/_scripts/hp_replace',
-             'build/_scripts/hp_validate'],
+             'build/_scripts/hp_validate', 'build/_scripts/hp_watch',
+             'build/_scripts/hp_cost', 'build/_scripts/hp_plan', 'build/_scripts/hp_build'],
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: Apache License",
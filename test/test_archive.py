@@ -0,0 +1,141 @@
+import sys
+import os
+import io
+import shutil
+import tarfile
+import zipfile
+import unittest
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import param_to_json
+from param_to_json import archive, cost, spool
+
+
+def _size(path, data, error):
+    return path, None if data is None else len(data), error
+
+
+class Tests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        with open("test/input/prot-prot-em.json", 'rb') as fh:
+            cls.data = fh.read()
+        cls.names = [f'run{i}/job_params.json' for i in range(5)]
+        cls.archives = {}
+        for suffix, mode in (('.tar', 'w'), ('.tar.gz', 'w:gz'), ('.tar.xz', 'w:xz')):
+            path = os.path.join(cls.tmp, f'runs{suffix}')
+            with tarfile.open(path, mode) as tf:
+                for name in cls.names + ['run0/notes.txt', 'run0/.hidden.json']:
+                    info = tarfile.TarInfo(name)
+                    info.size = len(cls.data)
+                    tf.addfile(info, io.BytesIO(cls.data))
+            cls.archives[suffix] = path
+        path = os.path.join(cls.tmp, 'runs.zip')
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for name in cls.names + ['run0/notes.txt']:
+                zf.writestr(name, cls.data)
+        cls.archives['.zip'] = path
+        cls.single = os.path.join(cls.tmp, 'single.tgz')
+        with tarfile.open(cls.single, 'w:gz') as tf:
+            tf.add("test/input/prot-prot-em.json", arcname='job_params.json')
+
+    @classmethod
+    def tearDownClass(cls):
+        archive.close_archives()
+        shutil.rmtree(cls.tmp)
+
+    def test_split_path(self):
+        """Test parsing of archive member paths"""
+        self.assertEqual(archive.split_path('a.tar.gz::run1/job.json'), ('a.tar.gz', 'run1/job.json'))
+        self.assertEqual(archive.split_path('job.json'), ('job.json', None))
+        self.assertTrue(archive.is_archive('runs.TGZ'))
+        self.assertFalse(archive.is_archive('runs.json'))
+        self.assertTrue(archive.is_compressed_tar(self.archives['.tar.gz']))
+        self.assertFalse(archive.is_compressed_tar(self.archives['.tar']))
+        self.assertFalse(archive.is_compressed_tar(self.archives['.zip']))
+
+    def test_list_members(self):
+        """Test listing and expansion of archive members"""
+        for path in self.archives.values():
+            self.assertEqual(archive.list_members(path), self.names)
+            self.assertEqual(archive.expand(path), [f'{path}::{name}' for name in self.names])
+            self.assertEqual(archive.expand(f'{path}::run[12]/*'),
+                             [f'{path}::run1/job_params.json', f'{path}::run2/job_params.json'])
+        self.assertEqual(archive.expand('job.json'), ['job.json'])
+        with self.assertRaises(archive.ArchiveError):
+            archive.list_members("test/input/prot-prot-em.json")
+
+    def test_read_file(self):
+        """Test reading archive members"""
+        for path in self.archives.values():
+            member = f'{path}::run3/job_params.json'
+            self.assertEqual(archive.read_file(member), self.data)
+            self.assertTrue(archive.isfile(member))
+            self.assertFalse(archive.isfile(f'{path}::run3/missing.json'))
+            with self.assertRaises(FileNotFoundError):
+                archive.read_file(f'{path}::run3/missing.json')
+            # Several parameter files, the member must be given
+            with self.assertRaises(archive.ArchiveError):
+                archive.read_file(path)
+        self.assertEqual(archive.read_file(self.single), self.data)
+        self.assertEqual(archive.read_file("test/input/prot-prot-em.json"), self.data)
+
+    def test_load(self):
+        """Test loading parameters from archives"""
+        expected = param_to_json.HADDOCKParam()
+        expected.load("test/input/prot-prot-em.json")
+        for path in list(self.archives.values()) + [self.single]:
+            params = param_to_json.HADDOCKParam()
+            params.load(f'{path}::run1/job_params.json' if path != self.single else path)
+            self.assertEqual(params.dumps(), expected.dumps())
+        with self.assertRaises(param_to_json.HADDOCKParamError):
+            params.load(self.archives['.zip'])
+
+    def test_list_files(self):
+        """Test expansion of archives in batch inputs"""
+        files = spool.list_files([self.archives['.tar.gz'], os.path.join(self.tmp, '*.zip'),
+                                  f"{self.archives['.tar']}::run0/*"])
+        self.assertEqual(len(files), 12)
+        self.assertIn(f"{self.archives['.tar']}::run0/notes.txt", files)
+        self.assertIn(f"{self.archives['.zip']}::run4/job_params.json", files)
+
+    def test_map_files(self):
+        """Test processing archive members in parallel"""
+        paths = ["test/input/prot-prot-em.json"]
+        for path in self.archives.values():
+            paths.extend(archive.expand(path))
+        paths.append(f"{self.archives['.tar.gz']}::missing.json")
+        paths.append(f"{self.archives['.zip']}::missing.json")
+        for workers in (1, 3):
+            results = archive.map_files(_size, paths, workers=workers)
+            self.assertEqual([r[0] for r in results], paths)
+            self.assertTrue(all(r[1] == len(self.data) for r in results[:-2]))
+            self.assertEqual([r[1] for r in results[-2:]], [None, None])
+            self.assertIn('not found', results[-1][2])
+        self.assertEqual([path for path, _, _ in archive.iter_files(paths[:2])], paths[:2])
+
+        # Truncated archive: every member gets a result, the ones that cannot be read an error
+        truncated = os.path.join(self.tmp, 'truncated.tar.gz')
+        with open(self.archives['.tar.gz'], 'rb') as fh, open(truncated, 'wb') as out:
+            data = fh.read()
+            out.write(data[:len(data) // 2])
+        paths = [f'{truncated}::{name}' for name in self.names]
+        for workers in (1, 2):
+            results = archive.map_files(_size, paths, workers=workers)
+            self.assertEqual([r[0] for r in results], paths)
+            self.assertIsNone(results[-1][1])
+            self.assertIn('Cannot read', results[-1][2])
+
+    def test_estimate_archive(self):
+        """Test cost estimation of archived runs"""
+        paths = spool.list_files([self.archives['.tar.gz']])
+        results = cost.estimate_files(paths, workers=2)
+        expected = cost.CostModel().estimate(param_to_json.json_backend.loads(self.data))
+        self.assertEqual([r[1] for r in results], [expected] * len(paths))
+
+
+if __name__ == '__main__':
+    unittest.main()
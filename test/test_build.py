@@ -0,0 +1,99 @@
+import sys
+import os
+import io
+import shutil
+import unittest
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import param_to_json
+from param_to_json import build
+from param_to_json.profiling import MemoryUsage
+
+
+class Tests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.template = param_to_json.HADDOCKParam()
+        self.template.load("test/input/prot-prot-em.json")
+        self.pdbs = []
+        for i, partner in sorted(self.template.partners.items()):
+            path = os.path.join(self.tmp, f'mol{i}.pdb')
+            with open(path, 'w', newline='') as fh:
+                fh.write(partner.raw_pdb)
+            self.pdbs.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def build(self, pdbs, **kwargs):
+        out = io.StringIO()
+        build.build(self.template, pdbs, out, **kwargs)
+        return out.getvalue()
+
+    def test_build(self):
+        """Test building a parameter file from PDB files"""
+        text = self.build(self.pdbs, chunk_size=100)
+        params = param_to_json.HADDOCKParam()
+        params.load(io.StringIO(text))
+        self.assertEqual(params.nb_partners, 2)
+        self.assertEqual(params.get('partners.1.pdb_file'), 'mol1.pdb')
+        self.assertEqual(params.get('partners.2.root'), 'mol2')
+        self.assertEqual(params.get('partners.2.psf_file'), 'mol2.psf')
+        for i in ('1', '2'):
+            self.assertEqual(params.partners[i].raw_pdb, self.template.partners[i].raw_pdb)
+            self.assertEqual(params.get(f'partners.{i}.segid'), self.template.get(f'partners.{i}.segid'))
+        # Same output as dumps()
+        self.assertEqual(text, params.dumps() + '\n')
+        # Template left untouched
+        self.assertEqual(self.template.get('partners.1.pdb_file'), 'protein1.pdb')
+
+    def test_build_partner_count(self):
+        """Test building parameter files with more or fewer partners than the template"""
+        params = param_to_json.HADDOCKParam()
+        params.load(io.StringIO(self.build(self.pdbs + self.pdbs[:1])))
+        self.assertEqual(params.nb_partners, 3)
+        self.assertEqual(len({p.segid for p in params.partners.values()}), 3)
+        self.assertEqual(params.get('partners.3.activereslist'), self.template.get('partners.2.activereslist'))
+        params.load(io.StringIO(self.build(self.pdbs[1:])))
+        self.assertEqual(params.nb_partners, 1)
+        self.assertEqual(params.get('partners.1.pdb_file'), 'mol2.pdb')
+
+    def test_build_escape(self):
+        """Test escaping of the PDB content"""
+        path = os.path.join(self.tmp, 'odd.pdb')
+        content = 'REMARK "quoted" \\ tab\there é\U0001f600\r\nEND\n'
+        with open(path, 'w', encoding='utf-8', newline='') as fh:
+            fh.write(content)
+        for chunk_size in (1, 3, 1024):
+            params = param_to_json.HADDOCKParam()
+            params.load(io.StringIO(self.build([path, self.pdbs[1]], chunk_size=chunk_size)))
+            self.assertEqual(params.partners['1'].raw_pdb, content)
+
+    def test_build_errors(self):
+        """Test building with missing PDB files or template partners"""
+        with self.assertRaises(param_to_json.HADDOCKParamError):
+            self.build([os.path.join(self.tmp, 'missing.pdb')])
+        self.template.set('partners', {})
+        with self.assertRaises(param_to_json.HADDOCKParamError):
+            self.build(self.pdbs)
+
+    def test_build_memory(self):
+        """Test that the PDB content is streamed"""
+        path = os.path.join(self.tmp, 'large.pdb')
+        with open(path, 'w') as fh:
+            for _ in range(200):
+                fh.write(self.template.partners['1'].raw_pdb)
+        size = os.path.getsize(path)
+        output = os.path.join(self.tmp, 'out.json')
+        with MemoryUsage() as usage:
+            build.build(self.template, [path, self.pdbs[1]], output, chunk_size=64 * 1024)
+        self.assertLess(usage.peak, size / 4)
+        params = param_to_json.HADDOCKParam()
+        params.load(output)
+        self.assertEqual(len(params.partners['1'].raw_pdb), size)
+
+
+if __name__ == '__main__':
+    unittest.main()
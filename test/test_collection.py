@@ -0,0 +1,115 @@
+import sys
+import os
+import shutil
+import unittest
+import tempfile
+from array import array
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import param_to_json
+from param_to_json.collection import HADDOCKParamCollection
+
+
+class Tests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        base = param_to_json.HADDOCKParam()
+        base.load("test/input/prot-prot-em.json")
+        for i in range(6):
+            run = base.derive(structures_0=1000 * (i + 1), clust_meth='FCC' if i % 2 else 'RMSD')
+            run.dump(os.path.join(cls.tmp, f'run{i}.json'))
+        with open(os.path.join(cls.tmp, 'broken.json'), 'w') as fh:
+            fh.write('{')
+        with open(os.path.join(cls.tmp, 'latin1.json'), 'wb') as fh:
+            fh.write('{"runname": "caf\u00e9"}'.encode('latin-1'))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def setUp(self):
+        self.runs = HADDOCKParamCollection()
+        with self.assertLogs(level='WARNING'):
+            self.assertEqual(self.runs.load(self.tmp, workers=1), 6)
+
+    def test_load(self):
+        """Test loading a collection, sequentially and in parallel"""
+        self.assertEqual(len(self.runs), 6)
+        self.assertEqual([os.path.basename(path) for path in self.runs.paths], [f'run{i}.json' for i in range(6)])
+        self.assertEqual([os.path.basename(path) for path, _ in self.runs.errors], ['broken.json', 'latin1.json'])
+        parallel = HADDOCKParamCollection()
+        with self.assertLogs(level='WARNING'):
+            parallel.load(self.tmp, workers=2)
+        self.assertEqual([p.dumps() for p in parallel], [p.dumps() for p in self.runs])
+        self.assertIsInstance(self.runs[0], param_to_json.HADDOCKParam)
+        self.assertEqual(len(self.runs[2:4]), 2)
+        with self.assertRaises(param_to_json.HADDOCKParamError):
+            HADDOCKParamCollection([param_to_json.HADDOCKParam()])
+
+    def test_get(self):
+        """Test column-wise get"""
+        structures = self.runs.get('structures_0')
+        self.assertEqual(structures, array('q', [1000, 2000, 3000, 4000, 5000, 6000]))
+        self.assertEqual(self.runs.get('clust_cutoff').typecode, 'd')
+        self.assertEqual(self.runs.get('clust_meth'), ['RMSD', 'FCC'] * 3)
+        self.assertEqual(self.runs.get('partners.1.activereslist')[0], self.runs[0].get('partners.1.activereslist'))
+        self.assertEqual(self.runs.get('weights.vdw[0]').typecode, 'd')
+        with self.assertRaises(param_to_json.HADDOCKParamError):
+            self.runs.get('missing')
+
+    def test_set(self):
+        """Test column-wise set"""
+        self.runs.set('structures_1', array('q', range(6)))
+        self.assertEqual([p.get('structures_1') for p in self.runs], list(range(6)))
+        self.runs.set('clust_meth', ['FCC'] * 6)
+        self.assertEqual(set(self.runs.get('clust_meth')), {'FCC'})
+        self.runs.set('partners.2.activereslist', [[i, i + 1] for i in range(6)])
+        self.assertEqual(self.runs[3].get('partners.2.activereslist'), [3, 4])
+        self.runs.set('weights.vdw[1]', [0.5] * 6)
+        self.assertEqual(list(self.runs.get('weights.vdw[1]')), [0.5] * 6)
+        with self.assertRaises(param_to_json.HADDOCKParamFormatError):
+            self.runs.set('structures_1', [1.0] * 6)
+        with self.assertRaises(param_to_json.HADDOCKParamFormatError):
+            self.runs.set('structures_1', array('d', [1.0] * 6))
+        with self.assertRaises(param_to_json.HADDOCKParamFormatError):
+            self.runs.set('partners.2.activereslist', [['1']] * 6)
+        with self.assertRaises(param_to_json.HADDOCKParamError):
+            self.runs.set('structures_1', [1, 2])
+        # Nothing changed on errors
+        self.assertEqual(list(self.runs.get('structures_1')), list(range(6)))
+
+    def test_set_derived(self):
+        """Test column-wise set on derived and thread-safe parameter sets"""
+        base = self.runs[0]
+        runs = HADDOCKParamCollection([base.derive(), base.derive()])
+        runs.set('partners.1.activereslist', [[1], [2]])
+        runs.set('amb_cool1', [1.0, 2.0])
+        self.assertEqual(runs.get('amb_cool1'), array('d', [1.0, 2.0]))
+        self.assertNotEqual(base.get('partners.1.activereslist'), [1])
+        self.assertNotEqual(base.get('amb_cool1'), 1.0)
+        safe = param_to_json.HADDOCKParam(thread_safe=True)
+        safe.load("test/input/prot-prot-em.json")
+        snapshot = safe.snapshot()
+        HADDOCKParamCollection([safe]).set('amb_cool1', [3.0])
+        self.assertEqual(safe.get('amb_cool1'), 3.0)
+        self.assertNotEqual(snapshot['amb_cool1'], 3.0)
+
+    def test_filter_groupby(self):
+        """Test filters and group-by on scalar parameters"""
+        fcc = self.runs.filter(clust_meth='FCC')
+        self.assertEqual(list(fcc.get('structures_0')), [2000, 4000, 6000])
+        large = self.runs.filter({'structures_0': lambda n: n > 2500}, clust_meth='RMSD')
+        self.assertEqual(list(large.get('structures_0')), [3000, 5000])
+        self.assertEqual(len(self.runs.filter({'weights.vdw[0]': 0.01})), 6)
+        groups = self.runs.groupby('clust_meth')
+        self.assertEqual(list(groups), ['RMSD', 'FCC'])
+        self.assertEqual(list(groups['FCC'].get('structures_0')), [2000, 4000, 6000])
+        self.assertIs(groups['FCC'][0], self.runs[1])
+        with self.assertRaises(param_to_json.HADDOCKParamError):
+            self.runs.groupby('partners')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import sys
+import os
+import shutil
+import unittest
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import param_to_json
+from param_to_json import cost
+
+
+class Tests(unittest.TestCase):
+    def setUp(self):
+        self.p = param_to_json.HADDOCKParam()
+        self.p.load("test/input/prot-prot-em.json")
+
+    def test_count_atoms(self):
+        """Test counting of the atoms of a PDB"""
+        self.assertEqual(cost.count_atoms("ATOM      1  N   MET A   1\nHETATM    2  O   HOH A   2\nTER\nEND\n"), 2)
+        self.assertEqual(cost.count_atoms(""), 0)
+        self.assertEqual(cost.count_atoms(self.p.partners["1"].raw_pdb), 818)
+
+    def test_estimate(self):
+        """Test cost estimation of a parameter file"""
+        model = cost.CostModel({'intercept': 1.0, 'models': 0.0, 'it0': 0.0, 'it1': 0.0, 'itw': 0.0})
+        estimate = model.estimate(self.p)
+        self.assertEqual(estimate.cpu_hours, 1.0)
+        self.assertEqual(estimate.cpus, 50)
+        self.assertEqual(estimate.wall_hours, 1.0 / 50)
+        self.assertEqual(estimate.features, {'models': 1040, 'it0': 1000 * 5 * 1274,
+                                             'it1': 20 * 3000 * 1274, 'itw': 20 * 1850 * 1274})
+        self.assertEqual(cost.CostModel().estimate(self.p.params), cost.CostModel().estimate(self.p))
+        self.assertLess(cost.CostModel().estimate(self.p.derive(structures_0=100)).cpu_hours,
+                        cost.CostModel().estimate(self.p).cpu_hours)
+        self.assertRaises(param_to_json.HADDOCKParamError, cost.CostModel().estimate, {'structures_0': 1})
+        self.assertRaises(param_to_json.HADDOCKParamError, cost.CostModel, {'dummy': 1.0})
+
+    def test_fit(self):
+        """Test calibration of the cost model on previous runs"""
+        reference = cost.CostModel({'intercept': 0.2, 'models': 1e-3, 'it0': 3e-7, 'it1': 4e-8, 'itw': 6e-8})
+        runs = []
+        for i, it0 in enumerate([300, 1000, 200, 5000, 800, 2500, 1200, 400]):
+            run = self.p.derive(structures_0=it0, structures_1=20 + 7 * i * i, waterrefine=20 + 3 * i,
+                                ntrials=1 + i % 3)
+            runs.append((run, reference.estimate(run).cpu_hours))
+        fitted = cost.CostModel.fit(runs)
+        for name, value in reference.coefficients.items():
+            self.assertAlmostEqual(fitted.coefficients[name] / value, 1.0, places=6)
+        self.assertRaises(param_to_json.HADDOCKParamError, cost.CostModel.fit, runs[:3])
+        self.assertRaises(param_to_json.HADDOCKParamError, cost.CostModel.fit, [runs[0]] * 6)
+
+        tmp = tempfile.mkdtemp()
+        try:
+            fitted.save(os.path.join(tmp, 'coefficients.json'))
+            self.assertEqual(cost.CostModel.load(os.path.join(tmp, 'coefficients.json')).coefficients,
+                             fitted.coefficients)
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_estimate_files(self):
+        """Test batch cost estimation, sequential and in parallel"""
+        paths = ["test/input/prot-prot-em.json", "dummy_path/dummy_file.json"]
+        for workers in (1, 2):
+            results = cost.estimate_files(paths, workers=workers)
+            self.assertEqual([r[0] for r in results], paths)
+            self.assertEqual(results[0][1], cost.CostModel().estimate(self.p))
+            self.assertIsNone(results[1][1])
+            self.assertIn("No such file", results[1][2])
+
+    def test_estimate_malformed_files(self):
+        """Test that malformed files give an error without stopping the batch"""
+        tmp = tempfile.mkdtemp()
+        try:
+            good = self.p.snapshot()
+            partners = {i: p.to_dict() for i, p in good['partners'].items()}
+            malformed = {
+                'list_partners': dict(good, partners=list(partners.values())),
+                'null_raw_pdb': dict(good, partners=dict(partners, **{'2': dict(partners['2'], raw_pdb=None)})),
+                'str_queues': dict(good, partners=partners, queues='x'),
+            }
+            paths = ["test/input/prot-prot-em.json"]
+            for name, params in malformed.items():
+                paths.append(os.path.join(tmp, f'{name}.json'))
+                with open(paths[-1], 'w') as fh:
+                    fh.write(param_to_json.json_backend.dumps(params))
+            paths.append("test/input/prot-prot-em.json")
+            for workers in (1, 2):
+                results = cost.estimate_files(paths, workers=workers)
+                self.assertEqual([r[1] is None for r in results], [False, True, True, True, False])
+                self.assertTrue(all("Cannot estimate cost" in r[2] for r in results[1:-1]))
+        finally:
+            shutil.rmtree(tmp)
@@ -0,0 +1,75 @@
+import sys
+import os
+import io
+import json
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import param_to_json
+from param_to_json import json_backend
+
+
+class Tests(unittest.TestCase):
+    def tearDown(self):
+        json_backend.select_backend()
+
+    def test_select_backend(self):
+        """Test selection of the JSON backend"""
+        self.assertEqual(json_backend.select_backend('json'), 'json')
+        self.assertEqual(json_backend.backend, 'json')
+        with self.assertLogs(level='WARNING'):
+            self.assertEqual(json_backend.select_backend('dummy'), json_backend.available_backends()[0])
+        os.environ[json_backend.ENV_VAR] = 'json'
+        try:
+            self.assertEqual(json_backend.select_backend(), 'json')
+        finally:
+            del os.environ[json_backend.ENV_VAR]
+
+    def test_identical_output(self):
+        """Test that all backends produce the same pretty output as the json module"""
+        with open("test/input/prot-prot-em.json") as fh:
+            text = fh.read()
+        reference = json.dumps(json.loads(text), indent=2, sort_keys=True)
+        for name in json_backend.available_backends():
+            json_backend.select_backend(name)
+            p = param_to_json.HADDOCKParam()
+            p.load("test/input/prot-prot-em.json")
+            self.assertEqual(p.dumps(), reference, msg=name)
+
+    def test_identical_output_special_values(self):
+        """Test pretty output of values formatted differently by fast backends"""
+        values = [1e-05, 1e16, 9999999999999998.0, 0.0001, -0.0, float("nan"), "café", "\x7f", 2 ** 70, {1: 0}]
+        for name in json_backend.available_backends():
+            json_backend.select_backend(name)
+            for value in values:
+                data = {"b": [value], "a": 1.5}
+                self.assertEqual(json_backend.dumps(data, indent=2, sort_keys=True),
+                                 json.dumps(data, indent=2, sort_keys=True), msg=f"{name}: {value!r}")
+
+    def test_decode_json_module_output(self):
+        """Test that all backends decode the values written by the json module like it does"""
+        text = json.dumps({"a": [float("nan"), float("inf"), -float("inf")], "b": 2 ** 70, "c": -2 ** 64,
+                           "d": 1e300, "e": 9223372036854775807})
+        reference = json.loads(text)
+        for name in json_backend.available_backends():
+            json_backend.select_backend(name)
+            for data in (text, text.encode()):
+                decoded = json_backend.loads(data)
+                self.assertEqual(json.dumps(decoded), json.dumps(reference), msg=name)
+                self.assertIs(type(decoded["b"]), int, msg=name)
+            p = param_to_json.HADDOCKParam()
+            p.load("test/input/prot-prot-em.json")
+            p.params['iniseed'] = 2 ** 70
+            p.params['amb_cool1'] = float("nan")
+            p2 = param_to_json.HADDOCKParam()
+            p2.load(io.StringIO(json.dumps(dict(p.snapshot()), default=param_to_json._json_default)))
+            self.assertEqual(p2.get('iniseed'), 2 ** 70, msg=name)
+
+    def test_decode_error(self):
+        """Test that all backends raise JSONDecodeError on malformed input"""
+        for name in json_backend.available_backends():
+            json_backend.select_backend(name)
+            self.assertRaises(json_backend.JSONDecodeError, json_backend.loads, '{"a": ')
+            p = param_to_json.HADDOCKParam()
+            self.assertRaises(param_to_json.HADDOCKParamFormatError, p.load, "test/input/prot-prot-wrong.json")
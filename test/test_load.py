@@ -1,7 +1,9 @@
 import sys
 import os
+import io
 import unittest
 import tempfile
+import subprocess
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -27,6 +29,18 @@ class Tests(unittest.TestCase):
         with tempfile.TemporaryFile() as fp:
             self.assertRaises(param_to_json.HADDOCKParamFormatError, p.load, fp)
 
+    def test_load_not_dict(self):
+        """Test loading JSON documents that are not parameter sets"""
+        for content in (b'null', b'[]', b'"x"', b'1'):
+            for skip_validation in (False, True):
+                p = param_to_json.HADDOCKParam()
+                with self.assertRaises(param_to_json.HADDOCKParamFormatError):
+                    p.load(io.BytesIO(content), skip_validation=skip_validation)
+        p = param_to_json.HADDOCKParam()
+        p.load("test/input/prot-prot-em.json")
+        p.params = []
+        self.assertRaises(param_to_json.HADDOCKParamFormatError, p.validate)
+
     def test_validate(self):
         p = param_to_json.HADDOCKParam()
         p.load("test/input/prot-prot-em.json")
@@ -41,6 +55,80 @@ class Tests(unittest.TestCase):
         self.assertEqual(cm.output, ['WARNING:root:No partner defined'])
         self.assertEqual(p.nb_partners, 0)
 
+    def test_validate_nested(self):
+        """Test validation of the partners and nested parameters"""
+        cases = {
+            'partners.1.segid': 1,
+            'partners.2.activereslist': ['1'],
+            'weights.vdw[1]': 1,
+            'queues[0].cpunumber': '50',
+            'centroids.1.coor': [11.6, '-2.9', 75.4],
+        }
+        for param, value in cases.items():
+            p = param_to_json.HADDOCKParam()
+            p.load("test/input/prot-prot-em.json")
+            param_to_json.compile_path(param).set(p.params, value, check=False)
+            with self.assertRaisesRegex(param_to_json.HADDOCKParamFormatError,
+                                        param.replace('[', '.').replace(']', '')):
+                p.validate()
+
+        p = param_to_json.HADDOCKParam()
+        p.load("test/input/prot-prot-em.json")
+        partners = p.params['partners']
+        del partners['2']['fully_flex']
+        with self.assertRaises(param_to_json.HADDOCKParamFormatError):
+            p.validate()
+        partners['3'] = partners.pop('2')
+        with self.assertRaisesRegex(param_to_json.HADDOCKParamFormatError, 'numbered'):
+            p.validate()
+        for number in ('02', '2\n', '\u0662', 2):
+            partners[number] = partners.pop(next(i for i in partners if i != '1'))
+            with self.assertRaisesRegex(param_to_json.HADDOCKParamFormatError, 'numbered'):
+                p.validate()
+        p.load("test/input/prot-prot-em.json")
+        p.params['partners']['2'].segid = p.params['partners']['1'].segid
+        with self.assertRaisesRegex(param_to_json.HADDOCKParamFormatError, 'several partners'):
+            p.validate()
+
+    def test_validate_errors(self):
+        """Test that all the errors are collected when asked, as reported by hp_validate"""
+        p = param_to_json.HADDOCKParam()
+        p.load("test/input/prot-prot-em.json")
+        partners = p.params['partners']
+        partners['2'].segid = partners['1'].segid
+        partners['2']['activereslist'] = ['x']
+        p.params['amb_cool2'] = 1
+        errors = []
+        param_to_json.HADDOCKParam.schema.check(p.params, errors=errors)
+        param_to_json.check_partners(partners, errors)
+        messages = '\n'.join(str(e) for e in errors)
+        self.assertEqual(len(errors), 3)
+        for text in ('amb_cool2', 'partners.2.activereslist', 'several partners'):
+            self.assertIn(text, messages)
+
+        script = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'haddock_param_validate.py')
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'params.json')
+            p.dump(path)
+            with open(path, 'rb') as fh:
+                result = subprocess.run([sys.executable, script], stdin=fh, stderr=subprocess.PIPE,
+                                        universal_newlines=True)
+        self.assertEqual(result.stderr.count('ERROR'), 3, result.stderr)
+        for text in ('amb_cool2', 'partners.2.activereslist', 'several partners'):
+            self.assertIn(text, result.stderr)
+
+    def test_validate_lazy(self):
+        """Test that validation does not load the PDB content of the partners"""
+        p = param_to_json.HADDOCKParam()
+        p.load("test/input/prot-prot-em.json")
+        loads = []
+        partner = p.params['partners']['1']
+        raw_pdb = partner.raw_pdb
+        partner.raw_pdb = lambda: loads.append(1) or raw_pdb
+        p.validate()
+        self.assertEqual(loads, [])
+        self.assertEqual(partner.raw_pdb, raw_pdb)
+
     def test_load(self):
         """Test parameter file loading"""
         p = param_to_json.HADDOCKParam()
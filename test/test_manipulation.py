@@ -1,6 +1,7 @@
 import sys
 import os
 import unittest
+import io
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -40,3 +41,87 @@ class Tests(unittest.TestCase):
         p.load("test/input/prot-prot-em.json")
         p.set("amb_cool1", 20.0)
         self.assertEqual(p.get("amb_cool1"), 20.0)
+
+    def test_derive(self):
+        """Test HADDOCKParam derive function"""
+        p = param_to_json.HADDOCKParam()
+        p.load("test/input/prot-prot-em.json")
+        d = p.derive(amb_cool1=20.0)
+        self.assertEqual(d.get("amb_cool1"), 20.0)
+        self.assertEqual(p.get("amb_cool1"), 10.0)
+        self.assertIs(d.get("partners"), p.get("partners"))
+        self.assertTrue(d.validate())
+        d.set("clust_meth", "RMSD")
+        self.assertEqual(p.get("clust_meth"), "FCC")
+        dd = d.derive(structures_0=500)
+        self.assertEqual(dd.get("amb_cool1"), 20.0)
+        self.assertEqual(dd.get("structures_0"), 500)
+        self.assertEqual(d.get("structures_0"), 1000)
+
+    def test_derive_wrong_param(self):
+        """Test HADDOCKParam derive function with wrong parameters"""
+        p = param_to_json.HADDOCKParam()
+        p.load("test/input/prot-prot-em.json")
+        self.assertRaises(param_to_json.HADDOCKParamError, p.derive, dummy_param=1)
+        self.assertRaises(param_to_json.HADDOCKParamFormatError, p.derive, amb_cool1=20)
+
+    def test_dumps(self):
+        """Test HADDOCKParam dumps function on a derived parameter set"""
+        p = param_to_json.HADDOCKParam()
+        p.load("test/input/prot-prot-em.json")
+        d = p.derive(amb_cool1=20.0)
+        q = param_to_json.HADDOCKParam()
+        q.load(io.StringIO(d.dumps()))
+        self.assertEqual(q.get("amb_cool1"), 20.0)
+        self.assertEqual(q.params["partners"], p.params["partners"])
+
+    def test_get_path(self):
+        """Test HADDOCKParam get function with nested parameter paths"""
+        p = param_to_json.HADDOCKParam()
+        p.load("test/input/prot-prot-em.json")
+        self.assertEqual(p.get("weights.vdw[2]"), 1.0)
+        self.assertEqual(p.get("queues[0].cpunumber"), 50)
+        self.assertEqual(p.get("queues.0.cpunumber"), 50)
+        self.assertEqual(p.get("partners.2.segid"), "B")
+        self.assertEqual(p.get("partners.2.activereslist"), [])
+        self.assertRaises(param_to_json.HADDOCKParamError, p.get, "weights.vdw[3]")
+        self.assertRaises(param_to_json.HADDOCKParamError, p.get, "partners.3.segid")
+        self.assertRaises(param_to_json.HADDOCKParamError, p.get, "partners..segid")
+        self.assertIs(param_to_json.compile_path("weights.vdw[2]"), param_to_json.compile_path("weights.vdw[2]"))
+
+    def test_set_path(self):
+        """Test HADDOCKParam set function with nested parameter paths"""
+        p = param_to_json.HADDOCKParam()
+        p.load("test/input/prot-prot-em.json")
+        p.set("weights.vdw[2]", 0.5)
+        self.assertEqual(p.get("weights")["vdw"], [0.01, 1.0, 0.5])
+        p.set("partners.2.activereslist", [12, 15])
+        self.assertEqual(p.get("partners.2.activereslist"), [12, 15])
+        p.set("partners.2.activereslist[1]", 16)
+        self.assertEqual(list(p.partners["2"].activereslist), [12, 16])
+        path = param_to_json.compile_path("queues.0.cpunumber")
+        p.set(path, 10)
+        self.assertEqual(p.get(path), 10)
+
+    def test_set_path_wrong_format(self):
+        """Test HADDOCKParam set function with nested parameter paths and wrong value types"""
+        p = param_to_json.HADDOCKParam()
+        p.load("test/input/prot-prot-em.json")
+        self.assertRaises(param_to_json.HADDOCKParamFormatError, p.set, "weights.vdw[2]", 1)
+        self.assertRaises(param_to_json.HADDOCKParamFormatError, p.set, "weights.vdw", [1.0, "a"])
+        self.assertRaises(param_to_json.HADDOCKParamFormatError, p.set, "partners.2.activereslist", ["12"])
+        self.assertRaises(param_to_json.HADDOCKParamFormatError, p.set, "queues.0.cpunumber", "10")
+        self.assertRaises(param_to_json.HADDOCKParamError, p.set, "partners.3.segid", "C")
+
+    def test_derive_set_path(self):
+        """Test that nested changes of a derived parameter set do not affect its parent"""
+        p = param_to_json.HADDOCKParam()
+        p.load("test/input/prot-prot-em.json")
+        d = p.derive()
+        d.set("weights.vdw[2]", 0.5)
+        d.set("partners.1.segid", "C")
+        self.assertEqual(p.get("weights.vdw[2]"), 1.0)
+        self.assertEqual(p.get("partners.1.segid"), "A")
+        self.assertEqual(d.get("weights.vdw[2]"), 0.5)
+        self.assertEqual(d.get("partners.1.segid"), "C")
+        self.assertIs(d.partners["1"].raw_pdb, p.partners["1"].raw_pdb)
@@ -0,0 +1,139 @@
+import sys
+import os
+import io
+import json
+import shutil
+import unittest
+import tempfile
+import contextlib
+import tracemalloc
+from unittest import mock
+import importlib.util
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import param_to_json
+from param_to_json.profiling import MemoryUsage, measure
+
+SCRIPTS = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+# Memory budgets, as (factor of the input size, constant overhead in bytes)
+LOAD_PEAK = (2.5, 64 * 1024)
+LOAD_RETAINED = (1.3, 32 * 1024)
+VALIDATE = (0, 8 * 1024)
+DUMPS_PEAK = (3.5, 64 * 1024)
+DERIVE_RETAINED = (0, 4 * 1024)
+SCRIPT_PEAK = (2.5, 128 * 1024)
+SCRIPT_RETAINED = (0, 32 * 1024)
+
+
+def load_script(name):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPTS, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Tests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        with open("test/input/prot-prot-em.json") as fh:
+            params = json.load(fh)
+        partners = list(params['partners'].values())
+        params['partners'] = {str(i + 1): dict(partners[i % 2], segid=chr(65 + i)) for i in range(10)}
+        cls.inputs = ["test/input/prot-prot-em.json", os.path.join(cls.tmp, 'large.json')]
+        with open(cls.inputs[1], 'w') as fh:
+            json.dump(params, fh, indent=2, sort_keys=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def assertBudget(self, usage, value, budget, size):
+        factor, overhead = budget
+        self.assertLessEqual(value, factor * size + overhead,
+                             msg=f"{usage} over budget for {size} bytes of input")
+
+    def test_memory_usage_reset_peak(self):
+        """Test that the peak is reset when tracing is already on, with and without reset_peak()"""
+        for reset_peak in (hasattr(tracemalloc, 'reset_peak'), False):
+            tracemalloc.start()
+            try:
+                data = bytes(10 ** 6)
+                del data
+                with mock.patch.object(tracemalloc, 'reset_peak', getattr(tracemalloc, 'reset_peak', None),
+                                       create=True):
+                    if not reset_peak:
+                        # Python < 3.9
+                        del tracemalloc.reset_peak
+                    with MemoryUsage() as usage:
+                        data = bytes(10 ** 5)
+                self.assertLess(usage.peak, 2 * 10 ** 5)
+                self.assertGreaterEqual(usage.retained, 10 ** 5)
+                self.assertTrue(tracemalloc.is_tracing())
+            finally:
+                tracemalloc.stop()
+
+    def test_memory_usage(self):
+        """Test MemoryUsage measures"""
+        with MemoryUsage() as usage:
+            data = bytearray(1024 * 1024)
+            del data
+        self.assertGreaterEqual(usage.peak, 1024 * 1024)
+        self.assertLess(usage.retained, 1024)
+        data, usage = measure(bytearray, 1024 * 1024)
+        self.assertGreaterEqual(usage.retained, 1024 * 1024)
+
+    def test_api_memory(self):
+        """Test memory budgets of loading, validating, dumping and deriving"""
+        for path in self.inputs:
+            size = os.path.getsize(path)
+            p = param_to_json.HADDOCKParam()
+            with MemoryUsage('load') as usage:
+                p.load(path)
+            self.assertBudget(usage, usage.peak, LOAD_PEAK, size)
+            self.assertBudget(usage, usage.retained, LOAD_RETAINED, size)
+
+            _, usage = measure(p.validate)
+            self.assertBudget(usage, usage.peak, VALIDATE, size)
+
+            _, usage = measure(p.dumps)
+            self.assertBudget(usage, usage.peak, DUMPS_PEAK, size)
+
+            derived, usage = measure(p.derive, amb_cool1=20.0)
+            self.assertBudget(usage, usage.retained, DERIVE_RETAINED, size)
+
+    def test_scripts_memory(self):
+        """Test memory budgets of the script entry points"""
+        summary = load_script('haddock_param_summary')
+        validate = load_script('haddock_param_validate')
+        replace = load_script('haddock_param_replace')
+        extract = load_script('haddock_param_extract_pdb')
+        path_param = param_to_json.compile_path('amb_cool1')
+        cwd = os.getcwd()
+        for path in self.inputs:
+            size = os.path.getsize(path)
+            with open(path) as fh, contextlib.redirect_stdout(io.StringIO()):
+                _, usage = measure(summary.print_summary, fh)
+            self.assertBudget(usage, usage.peak, SCRIPT_PEAK, size)
+            self.assertBudget(usage, usage.retained, SCRIPT_RETAINED, size)
+
+            with open(path) as fh:
+                _, usage = measure(validate.validate, fh, False)
+            self.assertBudget(usage, usage.peak, SCRIPT_PEAK, size)
+            self.assertBudget(usage, usage.retained, SCRIPT_RETAINED, size)
+
+            with open(path) as fh:
+                _, usage = measure(replace.replace, fh, path_param, '20.0')
+            self.assertBudget(usage, usage.peak, SCRIPT_PEAK, size)
+            self.assertBudget(usage, usage.retained, LOAD_RETAINED, size)
+
+            os.chdir(self.tmp)
+            try:
+                with open(os.path.join(cwd, path)) as fh, contextlib.redirect_stdout(io.StringIO()):
+                    _, usage = measure(extract.extract_pdbs, fh)
+            finally:
+                os.chdir(cwd)
+            self.assertBudget(usage, usage.peak, SCRIPT_PEAK, size)
+            self.assertBudget(usage, usage.retained, SCRIPT_RETAINED, size)
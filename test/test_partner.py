@@ -0,0 +1,80 @@
+import sys
+import os
+import json
+import unittest
+import tracemalloc
+from array import array
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import param_to_json
+
+
+class Tests(unittest.TestCase):
+    def test_load_partners(self):
+        """Test that partners are loaded as Partner objects"""
+        p = param_to_json.HADDOCKParam()
+        p.load("test/input/prot-prot-em.json")
+        partner = p.partners["1"]
+        self.assertIsInstance(partner, param_to_json.Partner)
+        self.assertEqual(partner.moleculetype, "Protein")
+        self.assertEqual(partner["segid"], "A")
+        self.assertIsInstance(partner.activereslist, array)
+        self.assertEqual(partner["activereslist"], [])
+
+    def test_round_trip(self):
+        """Test lossless conversion between Partner and its JSON form"""
+        with open("test/input/prot-prot-em.json") as fh:
+            raw = json.load(fh)
+        data = dict(raw["partners"]["1"], activereslist=[1, 2, 3], extra_key="x")
+        partner = param_to_json.Partner.from_dict(data)
+        self.assertEqual(partner.activereslist, array('i', [1, 2, 3]))
+        self.assertEqual(partner.to_dict(), data)
+        # Lists that are not only integers are kept as they are
+        for residues in ([True, 2], [1.0, 2], [2 ** 40]):
+            partner = param_to_json.Partner.from_dict(dict(data, activereslist=residues))
+            self.assertEqual(json.dumps(partner.to_dict()['activereslist']), json.dumps(residues))
+            self.assertIsInstance(partner.activereslist, list)
+        with self.assertRaises(param_to_json.HADDOCKParamFormatError):
+            param_to_json.check_partners({'1': param_to_json.Partner.from_dict(dict(data, activereslist=[True]))})
+
+        p = param_to_json.HADDOCKParam()
+        p.load("test/input/prot-prot-em.json")
+        self.assertEqual(p.dumps(), json.dumps(raw, indent=2, sort_keys=True))
+
+    def test_lazy_raw_pdb(self):
+        """Test that raw_pdb given as a callable is only read on access"""
+        calls = []
+
+        def read_pdb():
+            calls.append(1)
+            return "END\n"
+
+        partner = param_to_json.Partner(segid="A", raw_pdb=read_pdb)
+        self.assertIn("raw_pdb", partner)
+        self.assertEqual(calls, [])
+        self.assertEqual(partner.raw_pdb, "END\n")
+        self.assertEqual(partner["raw_pdb"], "END\n")
+        self.assertEqual(calls, [1])
+
+    def test_memory(self):
+        """Test that Partner objects use less memory than plain dictionaries"""
+        with open("test/input/prot-prot-em.json") as fh:
+            data = json.load(fh)["partners"]["1"]
+        data.pop("raw_pdb")
+        data["activereslist"] = list(range(1, 50))
+        encoded = json.dumps(data)
+
+        tracemalloc.start()
+        dicts = [json.loads(encoded) for _ in range(200)]
+        dict_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del dicts
+
+        tracemalloc.start()
+        partners = [param_to_json.Partner.from_dict(json.loads(encoded)) for _ in range(200)]
+        partner_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del partners
+
+        self.assertLess(partner_size, dict_size / 2)
@@ -0,0 +1,73 @@
+import sys
+import os
+import shutil
+import unittest
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import param_to_json
+from param_to_json import plan
+
+SCRIPTS = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+
+class Tests(unittest.TestCase):
+    def test_split_cpus(self):
+        """Test proportional split of CPUs"""
+        self.assertEqual(plan.split_cpus(7, [50, 10]), [6, 1])
+        self.assertEqual(plan.split_cpus(10, [1, 1, 1]), [4, 3, 3])
+        self.assertEqual(plan.split_cpus(1, [50, 10]), [1, 1])
+        self.assertEqual(plan.split_cpus(10, [0, 0]), [5, 5])
+        self.assertEqual(plan.split_cpus(10, []), [])
+
+    def test_allocate_cpus(self):
+        """Test allocation of cores proportionally to the work of the runs"""
+        self.assertEqual(plan.allocate_cpus([10, 5, 5], 100), [50, 25, 25])
+        self.assertEqual(plan.allocate_cpus([7, 2.2, 1], 13), [9, 3, 1])
+        self.assertEqual(plan.allocate_cpus([0, 0], 10), [5, 5])
+        # Capped runs leave their cores to the others
+        self.assertEqual(plan.allocate_cpus([10, 5, 5], 100, [20, 100, 100]), [20, 40, 40])
+        with self.assertLogs(level='WARNING'):
+            self.assertEqual(plan.allocate_cpus([1, 1, 1, 1], 3), [1, 1, 1, 1])
+
+    def test_makespan(self):
+        """Test makespan estimation"""
+        self.assertEqual(plan.makespan([10, 5], [5, 5], 10), 2.0)
+        self.assertEqual(plan.makespan([10, 5], [10, 10], 10), 1.5)
+        self.assertEqual(plan.makespan([], [], 10), 0.0)
+
+    def test_plan_runs(self):
+        """Test planning of the CPUs of a batch of runs"""
+        runs = []
+        for it0 in (100, 1000, 5000):
+            p = param_to_json.HADDOCKParam()
+            p.load("test/input/prot-prot-em.json")
+            p.set("structures_0", it0)
+            runs.append(p)
+        plans, before, after = plan.plan_runs(runs, 128)
+        self.assertEqual([p.cpus_before for p in plans], [50, 50, 50])
+        self.assertEqual(sum(p.cpus_after for p in plans), 128)
+        self.assertEqual([run.get("queues.0.cpunumber") for run in runs], [p.cpus_after for p in plans])
+        self.assertLess(after, before)
+        # Runs end at about the same time
+        self.assertLess(max(p.wall_hours for p in plans) / min(p.wall_hours for p in plans), 1.1)
+
+        plans, before, after = plan.plan_runs(runs, 128, max_per_run=20)
+        self.assertEqual([p.cpus_after for p in plans], [20, 20, 20])
+
+    def test_plan_script_outputs(self):
+        """Test that runs with the same file name are written to different files"""
+        tmp = tempfile.mkdtemp()
+        try:
+            for run in ('run1', 'run2'):
+                os.makedirs(os.path.join(tmp, 'runs', run))
+                shutil.copy("test/input/prot-prot-em.json", os.path.join(tmp, 'runs', run, 'job_params.json'))
+            output = os.path.join(tmp, 'planned')
+            subprocess.run([sys.executable, os.path.join(SCRIPTS, 'haddock_param_plan.py'), '-c', '64', '-o', output,
+                            os.path.join(tmp, 'runs', '*', 'job_params.json')], stdout=subprocess.DEVNULL, check=True)
+            for run in ('run1', 'run2'):
+                self.assertTrue(os.path.isfile(os.path.join(output, run, 'job_params.json')))
+        finally:
+            shutil.rmtree(tmp)
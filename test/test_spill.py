@@ -0,0 +1,98 @@
+import sys
+import os
+import copy
+import pickle
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import param_to_json
+from param_to_json.collection import HADDOCKParamCollection
+from param_to_json.spill import SpillStore
+
+
+class Tests(unittest.TestCase):
+    def setUp(self):
+        self.params = []
+        for _ in range(4):
+            params = param_to_json.HADDOCKParam()
+            params.load("test/input/prot-prot-em.json")
+            self.params.append(params)
+        self.expected = self.params[0].dumps()
+        self.size = sys.getsizeof(self.params[0].partners['1'].raw_pdb)
+
+    def test_budget(self):
+        """Test spilling and loading back PDB contents within a budget"""
+        with SpillStore(budget=3 * self.size) as store:
+            for params in self.params:
+                self.assertEqual(store.track(params), 2)
+            usage = store.usage()
+            self.assertLessEqual(store.resident, store.budget)
+            self.assertEqual(usage['resident_count'] + usage['spilled_count'], 8)
+            self.assertGreater(store.spilled, 0)
+            self.assertGreater(usage['disk'], 0)
+            for params in self.params:
+                self.assertEqual(params.dumps(), self.expected)
+                self.assertLessEqual(store.resident, store.budget)
+            disk = store.usage()['disk']
+            for params in self.params:
+                params.dumps()
+            self.assertEqual(store.usage()['disk'], disk)
+
+    def test_lru(self):
+        """Test that the least recently used contents are spilled first"""
+        first, second = self.params[:2]
+        sizes = [sys.getsizeof(p.raw_pdb) for p in second.partners.values()]
+        with SpillStore(budget=self.size + sum(sizes)) as store:
+            store.track(first)
+            first.partners['1'].raw_pdb
+            store.track(second)
+            self.assertIsNotNone(first.partners['1']._raw_pdb.text)
+            self.assertIsNone(first.partners['2']._raw_pdb.text)
+            self.assertIsNotNone(second.partners['1']._raw_pdb.text)
+
+    def test_copy(self):
+        """Test that copies of spilled partners get the content itself"""
+        with SpillStore(budget=0) as store:
+            store.track(self.params[0])
+            self.assertEqual(store.resident, 0)
+            partner = pickle.loads(pickle.dumps(self.params[0].partners['1']))
+            self.assertIsInstance(partner._raw_pdb, str)
+            self.assertEqual(copy.deepcopy(self.params[0]).dumps(), self.expected)
+            self.assertTrue(self.params[0].validate())
+            self.assertEqual(store.resident, 0)
+
+    def test_replace(self):
+        """Test that contents replaced after tracking are dropped from the store"""
+        with SpillStore(budget=self.size) as store:
+            store.track(self.params[0])
+            partners = self.params[0].partners
+            partners['1']['raw_pdb'] = 'ATOM\n'
+            self.assertEqual(store.usage()['resident_count'] + store.usage()['spilled_count'], 1)
+            del partners['2'].raw_pdb
+            self.assertEqual(store.usage(), {'resident': 0, 'resident_count': 0, 'spilled': 0,
+                                             'spilled_count': 0, 'disk': store.usage()['disk']})
+
+            # A derived parameter set shares the content until it replaces its own copy of the partner
+            store.track(self.params[1])
+            derived = self.params[1].derive(amb_cool1=20.0)
+            derived.set('partners.1.raw_pdb', 'ATOM\n')
+            self.assertEqual(store.usage()['resident_count'] + store.usage()['spilled_count'], 2)
+            self.params[1].partners['1'].raw_pdb = 'ATOM\n'
+            self.assertEqual(store.usage()['resident_count'] + store.usage()['spilled_count'], 1)
+            self.assertEqual(derived.partners['2'].raw_pdb, self.params[2].partners['2'].raw_pdb)
+
+    def test_collection(self):
+        """Test a collection with a memory budget"""
+        runs = HADDOCKParamCollection(self.params, memory_budget=self.size)
+        self.assertLessEqual(runs.spill.resident, self.size)
+        self.assertEqual(runs.spill.usage()['spilled_count'], 7)
+        self.assertEqual([p.dumps() for p in runs], [self.expected] * 4)
+        self.assertIs(runs[1:].spill, runs.spill)
+        runs.set('partners.1.raw_pdb', ['ATOM\n'] * 4)
+        self.assertEqual(runs.spill.usage()['resident_count'] + runs.spill.usage()['spilled_count'], 4)
+        runs.spill.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
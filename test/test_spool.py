@@ -0,0 +1,127 @@
+import sys
+import os
+import io
+import shutil
+import unittest
+import tempfile
+import contextlib
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from param_to_json import spool
+
+
+class Tests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.spool = os.path.join(self.tmp, 'spool')
+        os.makedirs(self.spool)
+        self.state = os.path.join(self.tmp, 'state.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def watcher(self):
+        return spool.SpoolWatcher(self.spool, state_file=self.state, accepted=os.path.join(self.tmp, 'accepted'),
+                                  rejected=os.path.join(self.tmp, 'rejected'))
+
+    def test_validate_data(self):
+        """Test validation of parameter file content"""
+        with open("test/input/prot-prot-em.json", 'rb') as fh:
+            self.assertEqual(spool.validate_data(fh.read()), (True, None))
+        with open("test/input/prot-prot-wrong.json", 'rb') as fh:
+            valid, error = spool.validate_data(fh.read())
+        self.assertFalse(valid)
+        self.assertIn("amb_cool1", error)
+        self.assertFalse(spool.validate_data(b'{"a": ')[0])
+
+    def test_scan(self):
+        """Test incremental validation of a spool directory"""
+        shutil.copy("test/input/prot-prot-em.json", os.path.join(self.spool, 'good.json'))
+        shutil.copy("test/input/prot-prot-wrong.json", os.path.join(self.spool, 'bad.json'))
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(self.watcher().scan(), 2)
+            self.assertTrue(os.path.isfile(os.path.join(self.tmp, 'accepted', 'good.json')))
+            self.assertTrue(os.path.isfile(os.path.join(self.tmp, 'rejected', 'bad.json')))
+
+            # Nothing new, even after a restart
+            watcher = self.watcher()
+            self.assertTrue(watcher.state['good.json']['valid'])
+            self.assertFalse(watcher.state['bad.json']['valid'])
+            self.assertEqual(watcher.scan(), 0)
+
+            # Touched files are not validated again, modified ones are
+            os.utime(os.path.join(self.spool, 'good.json'), (0, 0))
+            shutil.copy("test/input/prot-prot-em.json", os.path.join(self.spool, 'bad.json'))
+            self.assertEqual(watcher.scan(), 1)
+            self.assertTrue(watcher.state['bad.json']['valid'])
+
+            os.remove(os.path.join(self.spool, 'good.json'))
+            watcher.scan()
+            self.assertNotIn('good.json', watcher.state)
+
+    def test_scan_malformed(self):
+        """Test that content that is not a parameter set is rejected without stopping the watcher"""
+        shutil.copy("test/input/prot-prot-em.json", os.path.join(self.spool, 'a.json'))
+        for name, content in (('b.json', 'null'), ('c.json', '[]'), ('d.json', '"x"'), ('e.json', '\x00\xff')):
+            with open(os.path.join(self.spool, name), 'w') as fh:
+                fh.write(content)
+        watcher = self.watcher()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(watcher.scan(), 5)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.tmp, 'rejected'))), ['b.json', 'c.json', 'd.json', 'e.json'])
+        self.assertEqual(sorted(self.watcher().state), ['a.json', 'b.json', 'c.json', 'd.json', 'e.json'])
+
+    def test_scan_settle(self):
+        """Test that recently modified files are left for the next scan when polling"""
+        path = os.path.join(self.spool, 'new.json')
+        shutil.copy("test/input/prot-prot-em.json", path)
+        mtime = os.stat(path).st_mtime
+        watcher = self.watcher()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(watcher.scan(now=mtime + 0.1), 0)
+            self.assertEqual(watcher.scan(now=mtime + 1), 1)
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "inotify is only available on Linux")
+    def test_inotify(self):
+        """Test detection of new files with inotify"""
+        inotify = spool.Inotify(self.spool)
+        try:
+            shutil.copy("test/input/prot-prot-em.json", os.path.join(self.spool, 'new.json'))
+            self.assertEqual(inotify.read(timeout=5), ['new.json'])
+            self.assertEqual(inotify.read(timeout=0), [])
+            self.assertFalse(inotify.overflow)
+            # Queue overflow event, sent without a name
+            shutil.copy("test/input/prot-prot-em.json", os.path.join(self.spool, 'lost.json'))
+            event = spool._EVENT_HEADER.pack(-1, spool.IN_Q_OVERFLOW, 0, 0)
+            with mock.patch.object(spool.os, 'read', return_value=event):
+                self.assertEqual(inotify.read(timeout=5), [])
+            self.assertTrue(inotify.overflow)
+        finally:
+            inotify.close()
+
+    def test_watch_overflow(self):
+        """Test that the spool is scanned when inotify events have been lost"""
+        class Overflowed(object):
+            def __init__(self, path):
+                self.calls = 0
+                self.overflow = False
+
+            def read(self):
+                self.calls += 1
+                if self.calls > 1:
+                    raise KeyboardInterrupt
+                self.overflow = True
+                shutil.copy("test/input/prot-prot-em.json", os.path.join(watcher.spool, 'lost.json'))
+                os.utime(os.path.join(watcher.spool, 'lost.json'), (0, 0))
+                return []
+
+            def close(self):
+                pass
+
+        watcher = self.watcher()
+        with mock.patch.object(spool, 'Inotify', Overflowed), contextlib.redirect_stdout(io.StringIO()):
+            with self.assertRaises(KeyboardInterrupt):
+                watcher.watch()
+        self.assertTrue(watcher.state['lost.json']['valid'])
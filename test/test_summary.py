@@ -0,0 +1,92 @@
+import sys
+import os
+import io
+import json
+import shutil
+import tarfile
+import unittest
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import param_to_json
+from param_to_json import summary, wire
+from param_to_json.spool import list_files
+
+
+class Tests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        base = param_to_json.HADDOCKParam()
+        base.load("test/input/prot-prot-em.json")
+        for i in range(4):
+            base.derive(structures_0=1000 * (i + 1)).dump(os.path.join(cls.tmp, f'run{i}.json'))
+        with open(os.path.join(cls.tmp, 'run4.json'), 'wb') as fh:
+            partners = dict(base.partners, **{'3': dict(base.partners['1'], moleculetype='DNA', segid='C')})
+            wire.write(dict(base.snapshot(), partners=partners), fh)
+        with open(os.path.join(cls.tmp, 'broken.json'), 'w') as fh:
+            fh.write('{"structures_0": 1}')
+        with tarfile.open(os.path.join(cls.tmp, 'runs.tgz'), 'w:gz') as tar:
+            tar.add(os.path.join(cls.tmp, 'run0.json'), arcname='archived/job.json')
+        with tarfile.open(os.path.join(cls.tmp, 'many.tgz'), 'w:gz') as tar:
+            for i in range(3):
+                tar.add(os.path.join(cls.tmp, f'run{i}.json'), arcname=f'run{i}/job.json')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def test_summarize(self):
+        """Test the summary of a parameter set"""
+        with open("test/input/prot-prot-em.json", 'rb') as fh:
+            row = summary.summarize(wire.load(fh, raw_pdb=False))
+        self.assertEqual(row, {'it0': 1000, 'it1': 20, 'itw': 20, 'clust_meth': 'FCC', 'clust_cutoff': 0.6,
+                               'partners': ['Protein', 'Protein']})
+
+    def test_summarize_files(self):
+        """Test the summary of many files, sequentially and in parallel"""
+        paths = list_files([self.tmp, os.path.join(self.tmp, 'runs.tgz')])
+        rows, errors = summary.summarize_files(paths, workers=1)
+        self.assertEqual([os.path.basename(path) for path, _ in errors], ['broken.json'])
+        self.assertEqual([row['it0'] for _, row in rows], [1000, 2000, 3000, 4000, 1000, 1000])
+        self.assertEqual(rows[-2][1]['partners'], ['Protein', 'Protein', 'DNA'])
+        self.assertTrue(rows[-1][0].endswith('runs.tgz::archived/job.json'))
+        self.assertEqual(summary.summarize_files(paths, workers=2), (rows, errors))
+
+    def test_write(self):
+        """Test the TSV and JSON tables"""
+        rows, _ = summary.summarize_files(list_files([os.path.join(self.tmp, 'run*.json')]), workers=1)
+        out = io.StringIO()
+        summary.write_tsv(rows, out)
+        lines = [line.split('\t') for line in out.getvalue().splitlines()]
+        self.assertEqual(lines[0], ['file', 'it0', 'it1', 'itw', 'partner1', 'partner2', 'partner3',
+                                    'clust_meth', 'clust_cutoff'])
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(lines[1][1:], ['1000', '20', '20', 'Protein', 'Protein', '', 'FCC', '0.6'])
+        self.assertEqual(lines[5][6], 'DNA')
+        out = io.StringIO()
+        summary.write_json(rows, out)
+        table = json.loads(out.getvalue())
+        self.assertEqual(len(table), 5)
+        self.assertIsNone(table[0]['partner3'])
+        self.assertEqual(table[4]['partner3'], 'DNA')
+
+    def test_script(self):
+        """Test that hp_summary writes a table for a whole archive or a member pattern"""
+        script = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'haddock_param_summary.py')
+        archive = os.path.join(self.tmp, 'many.tgz')
+        for path, nb_rows in ((archive, 3), (f'{archive}::run[01]/*.json', 2), (os.path.join(self.tmp, 'runs.tgz'), 1)):
+            result = subprocess.run([sys.executable, script, path, '-j', '1'], stdin=subprocess.DEVNULL,
+                                    stdout=subprocess.PIPE, universal_newlines=True, check=True)
+            lines = result.stdout.splitlines()
+            self.assertEqual(lines[0].split('\t')[0], 'file')
+            self.assertEqual(len(lines), nb_rows + 1)
+        result = subprocess.run([sys.executable, script, f'{archive}::run1/job.json'], stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, universal_newlines=True, check=True)
+        self.assertEqual(result.stdout.splitlines()[0], 'it0\t2000')
+
+
+if __name__ == '__main__':
+    unittest.main()
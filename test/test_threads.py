@@ -0,0 +1,94 @@
+import sys
+import os
+import pickle
+import unittest
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import param_to_json
+
+
+class Tests(unittest.TestCase):
+    def setUp(self):
+        self.p = param_to_json.HADDOCKParam(thread_safe=True)
+        self.p.load("test/input/prot-prot-em.json")
+
+    def test_snapshot(self):
+        """Test that snapshots are not affected by later changes"""
+        snapshot = self.p.snapshot()
+        self.p.set("amb_cool1", 20.0)
+        self.p.set("weights.vdw[2]", 0.5)
+        self.p.set("partners.1.segid", "C")
+        self.assertEqual(snapshot["amb_cool1"], 10.0)
+        self.assertEqual(snapshot["weights"]["vdw"][2], 1.0)
+        self.assertEqual(snapshot["partners"]["1"].segid, "A")
+        self.assertEqual(self.p.get("amb_cool1"), 20.0)
+        self.assertEqual(self.p.get("weights.vdw[2]"), 0.5)
+        self.assertEqual(self.p.get("partners.1.segid"), "C")
+        with self.assertRaises(TypeError):
+            snapshot["amb_cool1"] = 30.0
+
+    def test_concurrent_writes(self):
+        """Test that concurrent writes to different parameters are not lost"""
+        keys = ["amb_cool1", "amb_cool2", "amb_cool3", "amb_hot", "unamb_cool1", "unamb_cool2", "unamb_cool3"]
+        paths = [f"weights.vdw[{i}]" for i in range(3)] + [f"weights.elec[{i}]" for i in range(3)]
+
+        def write(param):
+            for i in range(200):
+                self.p.set(param, float(i))
+
+        threads = [threading.Thread(target=write, args=(param,)) for param in keys + paths]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for param in keys + paths:
+            self.assertEqual(self.p.get(param), 199.0, msg=param)
+
+    def test_concurrent_reads(self):
+        """Test that a version of the parameters held by a reader is never modified by writers"""
+        errors = []
+        stop = threading.Event()
+
+        def read():
+            while not stop.is_set():
+                snapshot = self.p.snapshot()
+                before = list(snapshot["weights"]["vdw"]) + list(snapshot["partners"]["1"].activereslist)
+                after = list(snapshot["weights"]["vdw"]) + list(snapshot["partners"]["1"].activereslist)
+                if before != after:
+                    errors.append((before, after))
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for t in readers:
+            t.start()
+        for i in range(500):
+            self.p.set(f"weights.vdw[{i % 3}]", float(i))
+            self.p.set("partners.1.activereslist", [i, i + 1])
+        stop.set()
+        for t in readers:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.p.get("partners.1.activereslist"), [499, 500])
+
+    def test_validate(self):
+        """Test that validation after a skipped one leaves the object usable"""
+        p = param_to_json.HADDOCKParam(thread_safe=True)
+        p.load("test/input/prot-prot-em.json", skip_validation=True)
+        self.assertTrue(p.validate())
+        self.assertTrue(p.valid)
+        self.assertFalse(p.skip_validation)
+        self.assertEqual(p.get("amb_cool1"), 10.0)
+
+    def test_derive_pickle(self):
+        """Test derived parameter sets and pickling in thread-safe mode"""
+        d = self.p.derive(amb_cool1=20.0)
+        self.assertTrue(d.thread_safe)
+        self.p.set("amb_cool2", 100.0)
+        self.assertEqual(d.get("amb_cool2"), 50.0)
+        d.set("weights.vdw[2]", 0.5)
+        self.assertEqual(self.p.get("weights.vdw[2]"), 1.0)
+
+        copy = pickle.loads(pickle.dumps(self.p))
+        self.assertTrue(copy.thread_safe)
+        self.assertEqual(copy.get("amb_cool2"), 100.0)
@@ -0,0 +1,122 @@
+import sys
+import os
+import io
+import json
+import math
+import shutil
+import unittest
+import tempfile
+import subprocess
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import param_to_json
+from param_to_json import build, wire
+
+SCRIPTS = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+
+class Tests(unittest.TestCase):
+    def setUp(self):
+        self.params = param_to_json.HADDOCKParam()
+        self.params.load("test/input/prot-prot-em.json")
+
+    def test_roundtrip(self):
+        """Test encoding and decoding of binary parameters"""
+        data = wire.dumps(self.params.snapshot())
+        self.assertTrue(wire.is_wire(data))
+        self.assertLess(len(data), len(self.params.dumps()))
+        params = param_to_json.HADDOCKParam()
+        params.load(io.BytesIO(data))
+        self.assertEqual(params.dumps(), self.params.dumps())
+        # JSON is still detected
+        with open("test/input/prot-prot-em.json", 'rb') as fh:
+            self.assertEqual(wire.load(fh), wire.loads(data))
+
+    def test_special_values(self):
+        """Test values not supported by every JSON library"""
+        self.params.set('amb_cool1', float('inf'))
+        self.params.set('iniseed', 2 ** 70)
+        self.params.set('runname', 'é\U0001f600')
+        params = param_to_json.HADDOCKParam()
+        params.load(io.BytesIO(wire.dumps(self.params.snapshot())))
+        self.assertTrue(math.isinf(params.get('amb_cool1')))
+        self.assertEqual(params.get('iniseed'), 2 ** 70)
+        self.assertEqual(params.get('runname'), 'é\U0001f600')
+
+    def test_skip_raw_pdb(self):
+        """Test decoding without the PDB contents"""
+        expected = self.params.snapshot()
+        expected = dict(expected, partners={i: {k: v for k, v in p.items() if k != 'raw_pdb'}
+                                            for i, p in expected['partners'].items()})
+        self.assertEqual(wire.loads(wire.dumps(self.params.snapshot()), raw_pdb=False), expected)
+        with open("test/input/prot-prot-em.json", 'rb') as fh:
+            self.assertEqual(wire.load(fh, raw_pdb=False), json.loads(json.dumps(expected)))
+        # Quotes and backslashes in the contents, "raw_pdb" in other strings
+        data = json.dumps({'runname': '"raw_pdb": "', 'partners': {'1': {'raw_pdb': 'A"B\\"C\\', 'segid': 'A'}}})
+        self.assertEqual(wire.loads(data, raw_pdb=False),
+                         {'runname': '"raw_pdb": "', 'partners': {'1': {'segid': 'A'}}})
+
+    def test_corrupted(self):
+        """Test truncated and corrupted binary parameters"""
+        data = wire.dumps(self.params.snapshot())
+        for broken in (data[:-1], data[:12], data[:40]):
+            with self.assertRaises(wire.WireFormatError):
+                wire.loads(broken)
+        with self.assertRaises(param_to_json.HADDOCKParamFormatError):
+            param_to_json.HADDOCKParam().load(io.BytesIO(data[:-1]))
+
+    def test_use_binary(self):
+        """Test the choice of the output format"""
+        read, write = os.pipe()
+        with os.fdopen(read, 'rb') as rfh, os.fdopen(write, 'w') as wfh:
+            with mock.patch.dict(os.environ, {wire.ENV_VAR: 'binary'}):
+                self.assertTrue(wire.use_binary(wfh))
+                self.assertFalse(wire.use_binary(io.StringIO()))
+                with tempfile.TemporaryFile('w') as fh:
+                    self.assertFalse(wire.use_binary(fh))
+            with mock.patch.dict(os.environ, {wire.ENV_VAR: 'json'}):
+                self.assertFalse(wire.use_binary(wfh))
+            # Opt-in, the reader of a pipe may be any tool
+            with mock.patch.dict(os.environ):
+                os.environ.pop(wire.ENV_VAR, None)
+                self.assertFalse(wire.use_binary(wfh))
+
+    def test_build(self):
+        """Test building binary parameters from PDB files"""
+        tmp = tempfile.mkdtemp()
+        try:
+            pdbs = []
+            for i, partner in sorted(self.params.partners.items()):
+                pdbs.append(os.path.join(tmp, f'mol{i}.pdb'))
+                with open(pdbs[-1], 'w', newline='') as fh:
+                    fh.write(partner.raw_pdb)
+            text, data = io.StringIO(), io.BytesIO()
+            build.build(self.params, pdbs, text)
+            build.build(self.params, pdbs, data, binary=True)
+            params = param_to_json.HADDOCKParam()
+            params.load(io.BytesIO(data.getvalue()))
+            self.assertEqual(params.dumps() + '\n', text.getvalue())
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_pipeline(self):
+        """Test that a pipeline of scripts writes the same JSON with and without the binary format"""
+        replace = [sys.executable, os.path.join(SCRIPTS, 'haddock_param_replace.py')]
+        outputs = []
+        for mode in ('binary', 'json'):
+            env = dict(os.environ, **{wire.ENV_VAR: mode})
+            first = subprocess.Popen(replace + ['amb_cool1', '20.0', 'test/input/prot-prot-em.json'],
+                                     stdout=subprocess.PIPE, env=env)
+            second = subprocess.run(replace + ['weights.vdw[2]', '0.5'], stdin=first.stdout,
+                                    stdout=subprocess.PIPE, env=dict(env, **{wire.ENV_VAR: 'json'}), check=True)
+            first.stdout.close()
+            first.wait()
+            outputs.append(second.stdout)
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertTrue(outputs[0].startswith(b'{'))
+
+
+if __name__ == '__main__':
+    unittest.main()